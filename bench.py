@@ -0,0 +1,264 @@
+# Headless benchmarks for the DatabaseManager hot paths.
+#
+# Builds synthetic databases (items, campaigns, historical sales) of the
+# requested sizes, runs the cashier operations against them without
+# PySide6 or a display, and writes latency percentiles and SQL statement
+# counts per operation to a JSON file.
+#
+#   python bench.py                        # small + medium scenarios
+#   python bench.py --scenario large --memory
+#   python bench.py --items 5000 --cart-lines 40 --campaigns 200 --sales 20000
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from data import DatabaseManager, _cart_versions
+from migrations import migrate
+
+# item count, cart lines, campaign count, historical sales
+SCENARIOS = {
+	"small":  {"items": 100, "cart_lines": 10, "campaigns": 0, "sales": 1000},
+	"medium": {"items": 5000, "cart_lines": 40, "campaigns": 500, "sales": 20000},
+	"large":  {"items": 20000, "cart_lines": 200, "campaigns": 5000, "sales": 200000},
+	"xl":     {"items": 100000, "cart_lines": 500, "campaigns": 10000, "sales": 1000000},
+}
+
+# Historical sales are spread over this many days, ending on REPORT_DATE
+HISTORY_DAYS = 365
+REPORT_DATE = "2025-09-03"
+WIP_RATIO = 0.01
+LINES_PER_SALE = 3
+# Lines per add_items_to_cart call (e.g. a burst of scans)
+BATCH_SIZE = 10
+
+def generate_database(db_name, items, campaigns, sales, seed=1):
+	"""
+	Creates a database with the latest schema and fills it with items,
+	campaigns and paid sales (plus a few on-hold ones). Returns the open
+	connection, which keeps an in-memory database alive.
+	"""
+	rng = random.Random(seed)
+	conn = sqlite3.connect(db_name, uri=db_name.startswith("file:"))
+	migrate(conn)
+
+	conn.executemany(
+		"INSERT INTO items (item_id, item_name, item_price, item_stock) VALUES (?, ?, ?, ?)",
+		((i, f"URUN {i}", float(rng.randint(10, 2000)), 1000) for i in range(1, items + 1)))
+
+	conn.executemany(
+		"INSERT INTO campaigns (item_id, min_quan, disc_type, disc_val) VALUES (?, ?, ?, ?)",
+		((rng.randint(1, items), rng.randint(2, 10), rng.choice(("fixed", "percent")), float(rng.randint(1, 50)))
+			for _ in range(campaigns)))
+
+	last_day = datetime.fromisoformat(REPORT_DATE) + timedelta(hours=9)
+	def sale_rows():
+		for n in range(sales):
+			sale_date = last_day - timedelta(days=rng.randrange(HISTORY_DAYS), seconds=rng.randrange(12 * 3600))
+			method = "WIP" if rng.random() < WIP_RATIO else rng.choice(("Nakit", "IBAN"))
+			yield (f"S{n:09d}", sale_date.isoformat(), f"MUSTERI {n % 500}", 0, 0.0, 0.0, method)
+	conn.executemany("""
+		INSERT INTO sales (sale_id, sale_date, customer_name, total_discount_perc, total_discount_num, total_amount, payment_method)
+		VALUES (?, ?, ?, ?, ?, ?, ?)
+	""", sale_rows())
+
+	def cart_rows():
+		for n in range(sales):
+			for item_id in rng.sample(range(1, items + 1), min(LINES_PER_SALE, items)):
+				count = rng.randint(1, 3)
+				yield (f"S{n:09d}", item_id, count, 0, 0.0, 0.0)
+	conn.executemany("""
+		INSERT INTO cart_items (sale_id, item_id, item_count, item_discount_perc, item_discount_num, item_total)
+		VALUES (?, ?, ?, ?, ?, ?)
+	""", cart_rows())
+	conn.execute("""
+		UPDATE cart_items
+		SET item_total = item_count * (SELECT item_price FROM items WHERE items.item_id = cart_items.item_id)
+	""")
+	conn.execute("""
+		UPDATE sales
+		SET total_amount = (SELECT COALESCE(SUM(item_total), 0) FROM cart_items WHERE cart_items.sale_id = sales.sale_id)
+	""")
+	conn.commit()
+	return conn
+
+class StatementCounter:
+	"""sqlite3 trace callback counting statements and commits."""
+	def __init__(self):
+		self.statements = 0
+		self.commits = 0
+
+	def __call__(self, sql):
+		word = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ""
+		if word == "COMMIT":
+			self.commits += 1
+		elif word not in ("BEGIN", "SAVEPOINT", "RELEASE", "ROLLBACK"):
+			self.statements += 1
+
+	def take(self):
+		counts = (self.statements, self.commits)
+		self.statements = 0
+		self.commits = 0
+		return counts
+
+def percentiles(samples):
+	ms = sorted(s * 1000.0 for s in samples)
+	if len(ms) == 1:
+		return {"n": 1, "mean": ms[0], "p50": ms[0], "p90": ms[0], "p99": ms[0], "max": ms[0]}
+	q = statistics.quantiles(ms, n=100, method="inclusive")
+	return {"n": len(ms), "mean": statistics.fmean(ms), "p50": q[49], "p90": q[89], "p99": q[98], "max": ms[-1]}
+
+def measure(name, dm, counter, fn, repeat, durable=False):
+	"""
+	Times repeat calls of fn() on the calling thread, then waits for the
+	writes they queued to be committed so their statements are counted.
+	Writes are only queued by fn(), so its latency is what the cashier
+	waits for; with durable=True each sample also waits for the op's
+	writes to run and commit, which is where the SQL cost shows up.
+	"""
+	samples = []
+	dm.flush().result()
+	counter.take()
+	for i in range(repeat):
+		start = time.perf_counter()
+		fn(i)
+		if durable:
+			dm.flush().result()
+		samples.append(time.perf_counter() - start)
+	dm.flush().result()
+	statements, commits = counter.take()
+	return {
+		"op": name,
+		"latency_ms": percentiles(samples),
+		"statements_per_op": statements / repeat,
+		"commits_per_op": commits / repeat,
+	}
+
+def bench_report(db_name, out_dir):
+	try:
+		import satislar
+	except ImportError as e:
+		return {"op": "sales_report_pdf", "skipped": f"reportlab not available ({e})"}
+	start = time.perf_counter()
+	satislar.sales_report_pdf(db_name, os.path.join(out_dir, "bench_report.pdf"), REPORT_DATE, cache_dir=None)
+	return {"op": "sales_report_pdf", "latency_ms": percentiles([time.perf_counter() - start])}
+
+def run_scenario(name, params, memory, repeat, out_dir):
+	items = params["items"]
+	cart_lines = min(params["cart_lines"], items)
+	if memory:
+		db_name = f"file:bench_{name}?mode=memory&cache=shared"
+	else:
+		db_name = os.path.join(out_dir, f"bench_{name}.db")
+		if os.path.exists(db_name):
+			os.remove(db_name)
+
+	print(f"BENCH   : {name}: generating {params}")
+	start = time.perf_counter()
+	keeper = generate_database(db_name, items, params["campaigns"], params["sales"])
+	generated_in = time.perf_counter() - start
+
+	dm = DatabaseManager(db_name)
+	counter = StatementCounter()
+	dm.worker.call(lambda conn: conn.set_trace_callback(counter))
+	rng = random.Random(2)
+	cart_items = rng.sample(range(1, items + 1), cart_lines)
+
+	results = []
+	sale_id = dm.start_new_sale("BENCH")
+	# Fill the cart one new line per tap, so the samples cover every cart size up to cart_lines
+	results.append(measure("add_item_to_cart (new line)", dm, counter,
+		lambda i: dm.add_item_to_cart(sale_id, cart_items[i], 1, 0, 0), cart_lines))
+	results.append(measure("add_item_to_cart (existing line)", dm, counter,
+		lambda i: dm.add_item_to_cart(sale_id, cart_items[i % cart_lines], 1, 0, 0), repeat))
+	results.append(measure(f"add_items_to_cart (batch of {BATCH_SIZE})", dm, counter,
+		lambda i: dm.add_items_to_cart(sale_id, [(cart_items[(i + k) % cart_lines], 1) for k in range(BATCH_SIZE)]), repeat))
+	results.append(measure("apply_discounts", dm, counter,
+		lambda i: dm.apply_discounts(sale_id), repeat))
+	# The same writes, each timed until it is committed
+	results.append(measure("add_item_to_cart (existing line, durable)", dm, counter,
+		lambda i: dm.add_item_to_cart(sale_id, cart_items[i % cart_lines], 1, 0, 0), repeat, durable=True))
+	results.append(measure(f"add_items_to_cart (batch of {BATCH_SIZE}, durable)", dm, counter,
+		lambda i: dm.add_items_to_cart(sale_id, [(cart_items[(i + k) % cart_lines], 1) for k in range(BATCH_SIZE)]),
+		repeat, durable=True))
+	results.append(measure("apply_discounts (durable)", dm, counter,
+		lambda i: dm.apply_discounts(sale_id), repeat, durable=True))
+	def tap_then_read(i):
+		dm.get_cart(sale_id).version = next(_cart_versions)  # force a new snapshot, as a tap would
+		dm.get_cart_items(sale_id)
+	results.append(measure("get_cart_items (after change)", dm, counter, tap_then_read, repeat))
+	def cold_read(i):
+		dm.carts.pop(sale_id, None)
+		dm.get_cart_items(sale_id)
+	results.append(measure("get_cart_items (cold load)", dm, counter, cold_read, repeat))
+	results.append(measure("onhold_orders", dm, counter,
+		lambda i: dm.onhold_orders(), max(1, repeat // 10)))
+	dm.remove_cart_of_sale(sale_id)
+	dm.flush().result()
+	results.append(bench_report(db_name, out_dir))
+
+	dm.close()
+	keeper.close()
+	return {"scenario": name, "params": dict(params, cart_lines=cart_lines), "memory": memory,
+		"generate_s": generated_in, "results": results}
+
+def main():
+	parser = argparse.ArgumentParser(description="Benchmark the DatabaseManager hot paths without a GUI.")
+	parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+		help="predefined size (repeatable); default: small and medium")
+	parser.add_argument("--items", type=int)
+	parser.add_argument("--cart-lines", type=int)
+	parser.add_argument("--campaigns", type=int)
+	parser.add_argument("--sales", type=int)
+	parser.add_argument("--memory", action="store_true", help="use in-memory databases instead of files")
+	parser.add_argument("--repeat", type=int, default=200, help="samples per operation")
+	parser.add_argument("--out", default="bench_results.json")
+	args = parser.parse_args()
+
+	scenarios = {name: SCENARIOS[name] for name in (args.scenario or ["small", "medium"])}
+	if any(v is not None for v in (args.items, args.cart_lines, args.campaigns, args.sales)):
+		base = SCENARIOS["small"]
+		scenarios = {"custom": {
+			"items": args.items or base["items"],
+			"cart_lines": args.cart_lines or base["cart_lines"],
+			"campaigns": args.campaigns if args.campaigns is not None else base["campaigns"],
+			"sales": args.sales or base["sales"],
+		}}
+
+	report = {
+		"meta": {
+			"date": datetime.now().isoformat(),
+			"python": platform.python_version(),
+			"sqlite": sqlite3.sqlite_version,
+			"platform": platform.platform(),
+		},
+		"scenarios": [],
+	}
+	with tempfile.TemporaryDirectory() as out_dir:
+		for name, params in scenarios.items():
+			report["scenarios"].append(run_scenario(name, params, args.memory, args.repeat, out_dir))
+
+	with open(args.out, "w") as f:
+		json.dump(report, f, indent=2)
+	for scenario in report["scenarios"]:
+		print(f"\n{scenario['scenario']} {scenario['params']}")
+		for r in scenario["results"]:
+			if "latency_ms" not in r:
+				print(f"  {r['op']:44} {r['skipped']}")
+				continue
+			lat = r["latency_ms"]
+			line = f"  {r['op']:44} p50 {lat['p50']:8.3f} ms  p99 {lat['p99']:8.3f} ms"
+			if "statements_per_op" in r:
+				line += f"  stmts/op {r['statements_per_op']:6.2f}  commits/op {r['commits_per_op']:5.2f}"
+			print(line)
+	print(f"\nResults written to {args.out}")
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,132 @@
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PySide6.QtGui import QFont, QColor
+from PySide6.QtWidgets import (
+	QTableView, QHeaderView, QAbstractItemView,
+	QWidget, QHBoxLayout, QLabel
+)
+
+COLUMN_COUNT, COLUMN_NAME, COLUMN_PRICE = range(3)
+
+class CartModel(QAbstractTableModel):
+	"""
+	Table model of the cart lines (count, name, price), fed by CartSnapshots.
+	set_snapshot() compares the new snapshot with the rows already shown
+	and only signals the rows that changed, were added or were removed,
+	so the view repaints just those rows instead of being rebuilt.
+	"""
+	def __init__(self, font_px, parent=None):
+		super().__init__(parent)
+		self.sale_id = None
+		self.version = None
+		self.lines = []
+		self.fonts = [QFont(), QFont(), QFont()]
+		for column, font in enumerate(self.fonts):
+			font.setPixelSize(font_px)
+			font.setBold(column != COLUMN_NAME)
+		self.foreground = QColor("white")
+
+	def rowCount(self, parent=QModelIndex()):
+		return 0 if parent.isValid() else len(self.lines)
+
+	def columnCount(self, parent=QModelIndex()):
+		return 0 if parent.isValid() else 3
+
+	def data(self, index, role=Qt.DisplayRole):
+		if not index.isValid():
+			return None
+		line = self.lines[index.row()]
+		column = index.column()
+		if role == Qt.DisplayRole:
+			if column == COLUMN_COUNT:
+				return f"{line.item_count}"
+			if column == COLUMN_NAME:
+				return line.item_name
+			return f"{line.item_total + line.item_discount_num} TL"
+		if role == Qt.FontRole:
+			return self.fonts[column]
+		if role == Qt.ForegroundRole:
+			return self.foreground
+		if role == Qt.TextAlignmentRole:
+			if column == COLUMN_PRICE:
+				return int(Qt.AlignRight | Qt.AlignVCenter)
+			return int(Qt.AlignLeft | Qt.AlignVCenter)
+		return None
+
+	def set_snapshot(self, snapshot):
+		"""Shows snapshot, emitting row-level change signals for the differences."""
+		if snapshot.sale_id != self.sale_id:
+			self.beginResetModel()
+			self.sale_id = snapshot.sale_id
+			self.version = snapshot.version
+			self.lines = list(snapshot.lines)
+			self.endResetModel()
+			return
+		if snapshot.version == self.version:
+			return
+		self.version = snapshot.version
+
+		new_ids = {line.item_id for line in snapshot.lines}
+		# Removed lines (from the bottom up so row numbers stay valid)
+		for row in range(len(self.lines) - 1, -1, -1):
+			if self.lines[row].item_id not in new_ids:
+				self.beginRemoveRows(QModelIndex(), row, row)
+				del self.lines[row]
+				self.endRemoveRows()
+
+		# Lines keep their order in a cart, so what remains lines up with the
+		# start of the snapshot and anything after it is new
+		for row, line in enumerate(snapshot.lines[:len(self.lines)]):
+			if line != self.lines[row]:
+				self.lines[row] = line
+				self.dataChanged.emit(self.index(row, 0), self.index(row, 2))
+		added = snapshot.lines[len(self.lines):]
+		if added:
+			first = len(self.lines)
+			self.beginInsertRows(QModelIndex(), first, first + len(added) - 1)
+			self.lines.extend(added)
+			self.endInsertRows()
+
+def make_cart_view(model, font_px, count_width):
+	"""A read-only, header-less table view for a CartModel; styled by the theme's #cartView rules."""
+	view = QTableView()
+	view.setModel(model)
+	view.setObjectName("cartView")
+	view.horizontalHeader().hide()
+	view.verticalHeader().hide()
+	view.setShowGrid(False)
+	view.setSelectionMode(QAbstractItemView.NoSelection)
+	view.setFocusPolicy(Qt.NoFocus)
+	view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+	view.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+	view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+	view.setWordWrap(False)
+	header = view.horizontalHeader()
+	header.setSectionResizeMode(COLUMN_COUNT, QHeaderView.Fixed)
+	header.resizeSection(COLUMN_COUNT, count_width)
+	header.setSectionResizeMode(COLUMN_NAME, QHeaderView.Stretch)
+	header.setSectionResizeMode(COLUMN_PRICE, QHeaderView.ResizeToContents)
+	view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+	view.verticalHeader().setDefaultSectionSize(int(font_px * 1.8))
+	return view
+
+def make_total_row(title, font_px):
+	"""
+	A row with a title and a value label (e.g. "TOTAL:" / "123.0 TL"), built
+	once; returns (row widget, value label) so the value is updated in place.
+	"""
+	row = QWidget()
+	row.setObjectName("totalRow")
+	layout = QHBoxLayout(row)
+	layout.setContentsMargins(5, 5, 5, 5)
+	font = QFont()
+	font.setPixelSize(font_px)
+	title_label = QLabel(title)
+	title_label.setFont(font)
+	layout.addWidget(title_label, 1)
+	font.setBold(True)
+	value_label = QLabel("0 TL")
+	value_label.setFont(font)
+	value_label.setMinimumWidth(font_px * 2)
+	value_label.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
+	layout.addWidget(value_label)
+	return row, value_label
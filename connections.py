@@ -0,0 +1,61 @@
+import os
+import sqlite3
+from contextlib import contextmanager
+
+# The database runs in WAL mode: readers never block the writer and the
+# writer never blocks readers, so reports can run during trading.
+# synchronous=NORMAL is durable across application crashes in WAL mode
+# and only fsyncs at checkpoints, which keeps commits cheap on slow disks.
+BUSY_TIMEOUT_MS = 5000
+CACHE_SIZE_KB = 8 * 1024
+MMAP_SIZE = 64 * 1024 * 1024
+
+def _tune(conn):
+	conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+	conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KB}")
+	conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+	conn.execute("PRAGMA temp_store = MEMORY")
+
+def connect_writer(db_name, isolation_level=None):
+	"""
+	Opens the read-write connection used by the checkout path.
+	There should be exactly one of these per database file (the
+	DatabaseWorker's); everything else reads through connect_reader.
+	"""
+	conn = sqlite3.connect(db_name, isolation_level=isolation_level, uri=db_name.startswith("file:"))
+	conn.row_factory = sqlite3.Row
+	conn.execute("PRAGMA journal_mode = WAL")
+	conn.execute("PRAGMA synchronous = NORMAL")
+	_tune(conn)
+	return conn
+
+def connect_reader(db_name):
+	"""Opens a read-only connection for reports and history screens."""
+	if db_name == ":memory:" or db_name.startswith("file:"):
+		# In-memory and URI databases (benchmarks) are opened as given
+		conn = sqlite3.connect(db_name, uri=True, isolation_level=None, check_same_thread=False)
+	else:
+		# Imported here: urllib.request is slow to import and the till's boot never needs it
+		from urllib.request import pathname2url
+		uri = f"file:{pathname2url(os.path.abspath(db_name))}?mode=ro"
+		conn = sqlite3.connect(uri, uri=True, isolation_level=None, check_same_thread=False)
+	conn.row_factory = sqlite3.Row
+	conn.execute("PRAGMA query_only = ON")
+	_tune(conn)
+	return conn
+
+@contextmanager
+def read_snapshot(db_name):
+	"""
+	Yields a read-only connection inside one read transaction, so every
+	query made through it sees the same consistent snapshot of the
+	database while checkout keeps writing.
+	"""
+	conn = connect_reader(db_name)
+	try:
+		conn.execute("BEGIN")
+		yield conn
+	finally:
+		if conn.in_transaction:
+			conn.execute("ROLLBACK")
+		conn.close()
@@ -0,0 +1,209 @@
+# Customer display in its own process.
+#
+# With POSTRINK_CUSTOMER_DISPLAY=process the cashier process does not
+# build Window2. RemoteCustomerDisplay takes its place: show_cart() and
+# show_welcome() encode the screen and the CartSnapshot into a block of
+# shared memory, and a child process running this module polls the block
+# once per frame and renders it with the usual Window2. The child never
+# opens the database and its painting never runs on the cashier's GUI
+# thread.
+#
+# Block layout (little endian): a sequence number, then the state
+# (screen, version, totals, sale id, customer name) and the lines. The
+# writer makes the sequence odd while it writes and even when done (a
+# seqlock); the reader decodes straight from the shared buffer with
+# struct.unpack_from and throws the result away if the sequence moved
+# while it was reading.
+
+import os
+import struct
+import subprocess
+import sys
+from multiprocessing import shared_memory
+
+from data import EMPTY_SNAPSHOT, CartSnapshot, SnapshotLine
+
+BLOCK_SIZE = 1024 * 1024
+POLL_MS = 16
+
+SCREEN_WELCOME, SCREEN_CART, SCREEN_QUIT = range(3)
+
+SEQ = struct.Struct("<Q")
+# screen, snapshot version, line count, discount total, total, sale id length, customer name length
+STATE = struct.Struct("<BQIddHH")
+# item_id, item_price, item_count, item_discount_perc, item_discount_num, item_total, name length
+LINE = struct.Struct("<qdqdddH")
+
+def encode(screen, customer_name, snapshot):
+	sale_id = (snapshot.sale_id or "").encode()
+	name = customer_name.encode()
+	parts = [STATE.pack(screen, snapshot.version, len(snapshot.lines), snapshot.discount_total,
+		snapshot.total, len(sale_id), len(name)), sale_id, name]
+	for line in snapshot.lines:
+		item_name = (line.item_name or "").encode()
+		parts.append(LINE.pack(line.item_id, line.item_price, line.item_count, line.item_discount_perc,
+			line.item_discount_num, line.item_total, len(item_name)))
+		parts.append(item_name)
+	return b"".join(parts)
+
+def decode(buf, offset=SEQ.size):
+	"""Returns (screen, customer_name, CartSnapshot) read in place from buf."""
+	screen, version, count, discount_total, total, sale_id_len, name_len = STATE.unpack_from(buf, offset)
+	offset += STATE.size
+	sale_id = str(buf[offset:offset + sale_id_len], "utf-8") or None
+	offset += sale_id_len
+	customer_name = str(buf[offset:offset + name_len], "utf-8")
+	offset += name_len
+	lines = []
+	for _ in range(count):
+		item_id, item_price, item_count, perc, num, item_total, item_name_len = LINE.unpack_from(buf, offset)
+		offset += LINE.size
+		item_name = str(buf[offset:offset + item_name_len], "utf-8")
+		offset += item_name_len
+		lines.append(SnapshotLine(item_id, item_name, item_price, item_count, perc, num, item_total))
+	return screen, customer_name, CartSnapshot(sale_id, version, tuple(lines), discount_total, total)
+
+class SnapshotPublisher:
+	"""Writer side of the shared block (cashier process)."""
+	def __init__(self, size=BLOCK_SIZE):
+		self.shm = shared_memory.SharedMemory(create=True, size=size)
+		self.seq = 0
+		self.publish(SCREEN_WELCOME)
+
+	@property
+	def name(self):
+		return self.shm.name
+
+	def publish(self, screen, customer_name="", snapshot=EMPTY_SNAPSHOT):
+		payload = encode(screen, customer_name, snapshot)
+		end = SEQ.size + len(payload)
+		if end > self.shm.size:
+			print(f"ERROR   : Cart snapshot of {len(payload)} bytes does not fit the customer display block")
+			return False
+		buf = self.shm.buf
+		self.seq += 1
+		SEQ.pack_into(buf, 0, self.seq)
+		buf[SEQ.size:end] = payload
+		self.seq += 1
+		SEQ.pack_into(buf, 0, self.seq)
+		return True
+
+	def close(self):
+		self.shm.close()
+		self.shm.unlink()
+
+class SnapshotReader:
+	"""Reader side of the shared block (display process)."""
+	def __init__(self, name):
+		self.shm = shared_memory.SharedMemory(name=name)
+		try:
+			# The block belongs to the cashier process; keep this process's
+			# resource tracker from unlinking it when the display exits
+			from multiprocessing import resource_tracker
+			resource_tracker.unregister(self.shm._name, "shared_memory")
+		except Exception:
+			pass
+		self.seq = 0
+
+	def poll(self):
+		"""Returns (screen, customer_name, snapshot) if the block changed since the last poll, else None."""
+		buf = self.shm.buf
+		seq = SEQ.unpack_from(buf, 0)[0]
+		if seq == self.seq or seq & 1:
+			return None
+		try:
+			state = decode(buf)
+		except (struct.error, UnicodeDecodeError, ValueError):
+			return None  # torn read: lengths or text from a half-written block; retry on the next poll
+		if SEQ.unpack_from(buf, 0)[0] != seq:
+			return None  # written to while decoding; read it on the next poll
+		self.seq = seq
+		return state
+
+	def close(self):
+		self.shm.close()
+
+class RemoteCustomerDisplay:
+	"""
+	Stands in for Window2 in the cashier process: same show_cart() and
+	show_welcome(), but they only publish to the shared block read by the
+	display process.
+	"""
+	def __init__(self, controller):
+		self.controller = controller
+		self.publisher = SnapshotPublisher()
+		self.process = subprocess.Popen([sys.executable, os.path.abspath(__file__), self.publisher.name])
+		print(f"DISPLAY : Customer display running in process {self.process.pid}")
+
+	def show_welcome(self):
+		self.publisher.publish(SCREEN_WELCOME)
+
+	def show_cart(self, snapshot=None):
+		controller = self.controller
+		if snapshot is None:
+			snapshot = controller.database_manager.cart_snapshot(controller.curr_sale_id)
+		self.publisher.publish(SCREEN_CART, controller.curr_customer_name, snapshot)
+
+	def close(self):
+		self.publisher.publish(SCREEN_QUIT)
+		try:
+			self.process.wait(timeout=2)
+		except subprocess.TimeoutExpired:
+			self.process.kill()
+		self.publisher.close()
+
+class DisplayData:
+	"""
+	The display process's stand-in for AppData: Window2 and CustomerCartScreen
+	only need the customer name and the current snapshot, which come from
+	the shared block instead of a DatabaseManager.
+	"""
+	def __init__(self):
+		self.database_manager = self
+		self.curr_sale_id = None
+		self.curr_customer_name = ""
+		self.snapshot = EMPTY_SNAPSHOT
+
+	def cart_snapshot(self, sale_id):
+		return self.snapshot
+
+def run_display(name):
+	from PySide6.QtCore import QTimer
+	from PySide6.QtWidgets import QApplication
+	from main import Window2
+	from theme import apply_theme
+
+	app = QApplication(sys.argv[:1])
+	apply_theme(app)
+	reader = SnapshotReader(name)
+	data = DisplayData()
+	window = Window2(data)
+	parent_pid = os.getppid()
+
+	def poll():
+		if os.getppid() != parent_pid:
+			app.quit()  # the cashier process is gone
+			return
+		state = reader.poll()
+		if state is None:
+			return
+		screen, customer_name, snapshot = state
+		if screen == SCREEN_QUIT:
+			app.quit()
+		elif screen == SCREEN_CART:
+			data.curr_customer_name = customer_name
+			data.curr_sale_id = snapshot.sale_id
+			data.snapshot = snapshot
+			window.show_cart(snapshot)
+		else:
+			window.show_welcome()
+
+	timer = QTimer()
+	timer.timeout.connect(poll)
+	timer.start(POLL_MS)
+	code = app.exec()
+	reader.close()
+	return code
+
+if __name__ == "__main__":
+	sys.exit(run_display(sys.argv[1]))
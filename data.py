@@ -1,149 +1,670 @@
+import queue
 import random
 import time
 import sqlite3
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, namedtuple
 from datetime import datetime
+from itertools import count, groupby
 
-class DatabaseManager:
+from connections import read_snapshot
+from db_worker import DatabaseWorker
+from instrumentation import instrumentation
+from migrations import migrate
+
+INSERT_CART_LINE = """
+	INSERT INTO cart_items (item_count, item_discount_perc, item_discount_num, item_total, sale_id, item_id)
+	VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+UPDATE_CART_LINE = """
+	UPDATE cart_items
+	SET item_count         = ?,
+		item_discount_perc = ?,
+		item_discount_num  = ?,
+		item_total         = ?
+	WHERE sale_id = ? AND item_id = ?
+"""
+
+# Longest time (seconds) a cart change may stay queued before it is
+# committed; payment, suspend and cancel flush immediately.
+COMMIT_DELAY = 0.5
+
+# Carts kept in memory: the open sale plus recently shown or prefetched
+# on-hold sales
+CART_CACHE_SIZE = 32
+
+SELECT_CART_LINES = """
+	SELECT ci.sale_id, ci.item_id, i.item_name, i.item_price, ci.item_count, ci.item_discount_num, ci.item_total
+	FROM cart_items AS ci
+	JOIN items AS i ON ci.item_id = i.item_id
+	WHERE ci.sale_id IN ({})
+	ORDER BY ci.sale_id, ci.cart_item_id
+"""
+
+SELECT_CAMPAIGNS = """
+	SELECT item_id, min_quan, disc_type, disc_val
+	FROM campaigns
+	ORDER BY item_id, min_quan
+"""
+
+SELECT_ONHOLD_ORDERS = """
+	SELECT sale_id, customer_name, total_amount
+	FROM sales
+	WHERE payment_method = 'WIP'
+	ORDER BY sale_date DESC
+"""
+
+UPDATE_SALE_TOTALS = """
+	UPDATE sales
+	SET total_discount_num = ?,
+		total_amount       = ?
+	WHERE sale_id = ?
+"""
+
+def line_discount(campaign, base_total):
+	"""
+	Returns (discount_perc, discount_num, line_total) for a cart line whose
+	undiscounted total is base_total, given the campaign tier that applies
+	to it (or None).
+	"""
+	discount_num = 0.0
+	discount_perc = 0.0
+	if campaign:
+		disc_type, disc_val = campaign[0], campaign[1]
+		if disc_type == "percent":
+			discount_num = base_total * (disc_val / 100.0)
+			discount_perc = disc_val
+		elif disc_type == "fixed":
+			discount_num = min(base_total, disc_val)  # don’t go negative
+			discount_perc = (discount_num / base_total * 100.0) if base_total > 0 else 0.0
+	return discount_perc, discount_num, max(0.0, base_total - discount_num)
+
+class CampaignIndex:
+	"""
+	In-memory copy of the campaigns table.
+	Tiers are kept per item_id sorted by min_quan, so the best campaign for
+	a cart line is a binary search instead of a query. The index is loaded
+	lazily and must be invalidated whenever the campaigns table changes.
+	"""
+	def __init__(self):
+		self.loaded = False
+		self.tiers = {}
+
+	def load(self, conn):
+		cursor = conn.cursor()
+		cursor.execute(SELECT_CAMPAIGNS)
+		tiers = {}
+		for item_id, min_quan, disc_type, disc_val in cursor.fetchall():
+			min_quans, campaigns = tiers.setdefault(item_id, ([], []))
+			min_quans.append(min_quan)
+			campaigns.append((disc_type, disc_val, min_quan))
+		self.tiers = tiers
+		self.loaded = True
+
+	def invalidate(self):
+		self.loaded = False
+		self.tiers = {}
+
+	def best(self, item_id, item_count):
+		"""Returns (disc_type, disc_val, min_quan) of the highest tier with min_quan <= item_count, or None."""
+		entry = self.tiers.get(item_id)
+		if not entry:
+			return None
+		min_quans, campaigns = entry
+		i = bisect_right(min_quans, item_count or 0)
+		return campaigns[i - 1] if i else None
+
+class CatalogCache:
 	"""
-	A mock class to simulate database operations.
-	In a real application, this would connect to a database
-	and perform actual queries.
+	In-memory copy of the items table.
+	version is bumped by every write to the catalog; the rows are only
+	re-read when the cached copy is older than that, and screens can compare
+	version to skip rebuilding what they already show.
+	by_code maps scanned barcodes and keyed PLUs (the item_id as text) to
+	their rows, so a scan is one dict lookup.
 	"""
 	def __init__(self):
-		self.conn = None
-		self.db_name = 'database.db'
+		self.version = 0
+		self.loaded_version = -1
+		self.items = []
+		self.by_id = {}
+		self.by_code = {}
+		self.name_index = NameIndex([])
+
+	def invalidate(self):
+		self.version += 1
+
+	def load(self, conn):
+		cursor = conn.cursor()
+		cursor.execute("SELECT * FROM items")
+		self.items = cursor.fetchall()
+		self.by_id = {row["item_id"]: row for row in self.items}
+		self.by_code = {str(item_id): row for item_id, row in self.by_id.items()}
+		self.by_code.update((row["barcode"], row) for row in self.items if row["barcode"])
+		self.name_index = NameIndex(self.items)
+		self.loaded_version = self.version
+
+	def is_stale(self):
+		return self.loaded_version != self.version
+
+	def lookup(self, code):
+		"""Returns the row of a barcode or PLU, or None."""
+		return self.by_code.get(code.strip())
+
+	def search(self, text):
+		"""Returns the positions in items of the products whose name contains text, prefix matches first."""
+		return self.name_index.search(text)
+
+def fold_name(text):
+	"""Case-folds a product name or query the Turkish way (İ -> i, I -> ı)."""
+	return text.replace("İ", "i").replace("I", "ı").lower()
+
+class NameIndex:
+	"""
+	Prefix and substring index over item_name.
+	Prefix matches come from a bisect over the sorted folded names;
+	substring matches intersect the posting sets of the query's trigrams
+	and then confirm the candidates. Queries shorter than a trigram scan
+	the names directly.
+	"""
+	NGRAM = 3
+
+	def __init__(self, items):
+		self.names = [fold_name(row["item_name"] or "") for row in items]
+		self.sorted_names = sorted((name, pos) for pos, name in enumerate(self.names))
+		self.grams = {}
+		n = self.NGRAM
+		for pos, name in enumerate(self.names):
+			for gram in {name[i:i + n] for i in range(len(name) - n + 1)}:
+				self.grams.setdefault(gram, []).append(pos)
+
+	def search(self, text):
+		query = fold_name(text.strip())
+		if not query:
+			return list(range(len(self.names)))
+		start = bisect_left(self.sorted_names, (query, -1))
+		prefix = []
+		for name, pos in self.sorted_names[start:]:
+			if not name.startswith(query):
+				break
+			prefix.append(pos)
+		prefix.sort()
+		seen = set(prefix)
+
+		n = self.NGRAM
+		if len(query) < n:
+			return prefix + [pos for pos, name in enumerate(self.names) if pos not in seen and query in name]
+		candidates = None
+		for i in range(len(query) - n + 1):
+			postings = self.grams.get(query[i:i + n])
+			if not postings:
+				return prefix
+			candidates = set(postings) if candidates is None else candidates.intersection(postings)
+		rest = sorted(pos for pos in candidates if pos not in seen and query in self.names[pos])
+		return prefix + rest
+
+class CartLine:
+	"""
+	One line of an in-memory cart.
+	Fields can also be read as line['item_count'], like the sqlite3.Row
+	objects the screens used to receive.
+	"""
+	__slots__ = ("item_id", "item_name", "item_price", "item_count",
+		"item_discount_perc", "item_discount_num", "item_total")
+
+	def __init__(self, item_id, item_name, item_price, item_count=0):
+		self.item_id = item_id
+		self.item_name = item_name
+		self.item_price = item_price or 0
+		self.item_count = item_count
+		self.item_discount_perc = 0.0
+		self.item_discount_num = 0.0
+		self.item_total = 0.0
+
+	def __getitem__(self, key):
+		return getattr(self, key)
+
+	def keys(self):
+		return self.__slots__
+
+SnapshotLine = namedtuple("SnapshotLine", CartLine.__slots__)
+
+class CartSnapshot(namedtuple("CartSnapshot", "sale_id version lines discount_total total")):
+	"""
+	Immutable picture of a cart at one version.
+	lines is a tuple of SnapshotLine; the cashier and customer screens both
+	render from the same snapshot instead of querying the database.
+	"""
+	__slots__ = ()
+
+EMPTY_SNAPSHOT = CartSnapshot(None, 0, (), 0, 0)
+
+# Cart versions are drawn from one counter, so a sale's cart that is
+# dropped and reloaded never repeats a version a screen already shows
+_cart_versions = count(1)
+
+class Cart:
+	"""
+	In-memory cart of one sale.
+	Keeps the lines in insertion order and running sums of discount and
+	total, so changing one line only recomputes that line.
+	"""
+	def __init__(self, sale_id):
+		self.sale_id = sale_id
+		self.lines = {}
+		self.discount_total = 0.0
+		self.total = 0.0
+		self.version = next(_cart_versions)
+		self._snapshot = None
+
+	def snapshot(self):
+		"""Returns the CartSnapshot of the current version, building it at most once per version."""
+		if self._snapshot is None or self._snapshot.version != self.version:
+			lines = tuple(SnapshotLine(*(getattr(line, f) for f in CartLine.__slots__)) for line in self.lines.values())
+			self._snapshot = CartSnapshot(self.sale_id, self.version, lines, self.discount_total, self.total)
+		return self._snapshot
+
+	def reprice(self, line, campaigns):
+		"""Recomputes the discount of a single line and moves the running sums by the delta."""
+		self.discount_total -= line.item_discount_num
+		self.total -= line.item_total
+		base_total = line.item_price * line.item_count
+		line.item_discount_perc, line.item_discount_num, line.item_total = line_discount(
+			campaigns.best(line.item_id, line.item_count), base_total)
+		self.discount_total += line.item_discount_num
+		self.total += line.item_total
+		self.version = next(_cart_versions)
+
+	def add(self, line, count, campaigns):
+		line.item_count += count
+		self.lines.setdefault(line.item_id, line)
+		self.reprice(line, campaigns)
+		return line
+
+	def remove(self, item_id):
+		line = self.lines.pop(item_id)
+		self.discount_total -= line.item_discount_num
+		self.total -= line.item_total
+		self.version = next(_cart_versions)
+		return line
+
+class CartCache:
+	"""
+	LRU of in-memory carts by sale id.
+	generation is bumped whenever a cart is dropped, so a prefetch read
+	that started before the drop (and may hold older rows) is discarded
+	instead of installed.
+	"""
+	def __init__(self, size=CART_CACHE_SIZE):
+		self.size = size
+		self.carts = OrderedDict()
+		self.generation = 0
+
+	def __contains__(self, sale_id):
+		return sale_id in self.carts
+
+	def get(self, sale_id):
+		cart = self.carts.get(sale_id)
+		if cart is not None:
+			self.carts.move_to_end(sale_id)
+		return cart
+
+	def put(self, cart):
+		self.carts[cart.sale_id] = cart
+		self.carts.move_to_end(cart.sale_id)
+		while len(self.carts) > self.size:
+			self.carts.popitem(last=False)
+
+	def pop(self, sale_id, default=None):
+		self.generation += 1
+		return self.carts.pop(sale_id, default)
+
+	def clear(self):
+		self.generation += 1
+		self.carts.clear()
+
+class DatabaseManager:
+	"""
+	Data access for the POS screens.
+	The SQLite connection belongs to a DatabaseWorker thread: writes are
+	queued to it and return a Future right away, so the GUI thread never
+	waits on a commit. Cart writes are group-committed at most
+	commit_delay seconds later, or at a sale boundary through flush().
+	Carts, campaigns and the catalog are served from memory; the few reads
+	that need the database either return a Future (the *_async methods)
+	or wait for the worker once per cache load.
+	"""
+	def __init__(self, db_name='database.db', commit_delay=COMMIT_DELAY):
+		self.worker = None
+		self.db_name = db_name
+		self.commit_delay = commit_delay
+		self.campaigns = CampaignIndex()
+		self.catalog = CatalogCache()
+		self.carts = CartCache()
+		# Sales whose queued writes failed; filled on the worker thread and
+		# drained on the GUI thread, which owns the carts
+		self.failed_writes = queue.SimpleQueue()
+		# Optional callable(sale_id), called on the worker thread after a
+		# failed write; the GUI hands it on to its own thread
+		self.write_failed = None
 		self.connect()
 
 	def connect(self):
 		try:
-			self.conn = sqlite3.connect(self.db_name)
-			self.conn.row_factory = sqlite3.Row
+			self.worker = DatabaseWorker(self.db_name, self.commit_delay)
+			if instrumentation.enabled:
+				self.worker.tracer = instrumentation
+				self.worker.call(instrumentation.attach)
+			applied = self.worker.submit(migrate, flush=True).result()
+			if applied:
+				print(f"DATABASE: Upgraded schema to version {applied[-1]}.")
 			print("DATABASE: Successfully connected.")
 		except sqlite3.Error as e:
 			print(f"DATABASE: Connection failed: {e}")
 
 	def close(self):
-		if self.conn:
-			self.conn.close()
+		if self.worker:
+			self.worker.close()
 			print("DATABASE: Connection closed.")
 
+	def read_snapshot(self):
+		"""
+		Context manager yielding a read-only connection on a consistent
+		snapshot, for reports and history screens; it never waits for or
+		blocks the checkout writer.
+		"""
+		return read_snapshot(self.db_name)
+
+	def flush(self):
+		"""Commits every queued change; used at sale boundaries (payment, suspend, cancel)."""
+		return self.worker.flush()
+
+	def _write(self, job, what, *args, sale_id=None, flush=False):
+		"""
+		Queues a write job on the worker and returns its Future.
+		Failures are logged; if the job belongs to a sale, the sale is
+		queued for drop_failed_carts() so its in-memory cart is reloaded
+		from the database, and write_failed is told.
+		"""
+		future = self.worker.submit(job, *args, flush=flush)
+		def report(f):
+			# Runs on the worker thread: the carts are left to the GUI thread
+			if f.exception() is not None:
+				print(f"ERROR   : {what}: {f.exception()}")
+				if sale_id is not None:
+					self.failed_writes.put(sale_id)
+					if self.write_failed is not None:
+						self.write_failed(sale_id)
+		future.add_done_callback(report)
+		return future
+
+	def drop_failed_carts(self):
+		"""Drops the carts of sales whose writes failed and returns their sale ids (GUI thread)."""
+		dropped = set()
+		while not self.failed_writes.empty():
+			sale_id = self.failed_writes.get()
+			self.carts.pop(sale_id, None)
+			dropped.add(sale_id)
+		return dropped
+
+	def get_campaigns(self):
+		"""Returns the campaign index, loading it from the database on first use."""
+		if not self.campaigns.loaded:
+			self.worker.call(self.campaigns.load)
+		return self.campaigns
+
+	def add_campaign(self, item_id, min_quan, disc_type, disc_val):
+		def job(conn):
+			cursor = conn.cursor()
+			cursor.execute("""
+				INSERT INTO campaigns (item_id, min_quan, disc_type, disc_val)
+				VALUES (?, ?, ?, ?)
+			""", (item_id, min_quan, disc_type, disc_val))
+			return cursor.lastrowid
+		try:
+			camp_id = self.worker.submit(job, flush=True).result()
+			self.campaigns.invalidate()
+			self.carts.clear()
+			return camp_id
+		except sqlite3.Error as e:
+			print(f"ERROR   : sqlite3 error: {e}")
+			return None
+
+	def remove_campaign(self, camp_id):
+		def job(conn):
+			conn.execute("DELETE FROM campaigns WHERE camp_id = ?", (camp_id, ))
+		try:
+			self.worker.submit(job, flush=True).result()
+			self.campaigns.invalidate()
+			self.carts.clear()
+			return True
+		except sqlite3.Error as e:
+			print(f"ERROR   : sqlite3 error: {e}")
+			return False
+
 	def start_new_sale(self, customer_name):
 		# Generates a random, unique ID for the new sale
 		sale_id = f"{int(time.time())}-{random.randint(100, 999)}"
 		sale_date = datetime.now().isoformat()
 
-		try:
-			cursor = self.conn.cursor()
-			cursor.execute(
+		def job(conn):
+			conn.execute(
 				"""
 				INSERT INTO sales (sale_id, sale_date, customer_name, total_discount_perc, total_discount_num, total_amount, payment_method)
 				VALUES (?, ?, ?, ?, ?, ?, ?)
 				""", (sale_id, sale_date, customer_name, 0, 0.0, 0.0, "WIP"))
-			self.conn.commit()
-			print(f"NEW SALE: {sale_id} | {customer_name}")
-			return sale_id
-		except sqlite3.Error as e:
-			print(f"ERROR   : sqlite3 error: {e}")
-			return None
+		self._write(job, "Starting new sale", sale_id=sale_id)
+		# The sale is known to be empty, so its cart needs no load from the database
+		self.carts.put(Cart(sale_id))
+		print(f"NEW SALE: {sale_id} | {customer_name}")
+		return sale_id
+
+	def get_catalog(self):
+		"""Returns the catalog cache, re-reading the items table only if it changed since the last load."""
+		if self.catalog.is_stale():
+			self.worker.call(self.catalog.load)
+		return self.catalog
 
 	def get_all_products(self):
 		try:
-			cursor = self.conn.cursor()
-			cursor.execute("SELECT * FROM items")
-			return cursor.fetchall()
+			return self.get_catalog().items
 		except sqlite3.Error as e:
 			print(f"ERROR   : sqlite3 error: {e}")
 			return []
 
-	def get_sale_products(self, sale_id):
+	def get_item(self, item_id):
+		return self.get_catalog().by_id.get(item_id)
+
+	def get_item_by_code(self, code):
+		"""Returns the item row for a scanned barcode or keyed PLU, or None."""
+		return self.get_catalog().lookup(code)
+
+	def _update_item(self, item_id, column, value):
+		def job(conn):
+			return conn.execute(f"UPDATE items SET {column} = ? WHERE item_id = ?", (value, item_id)).rowcount > 0
 		try:
-			cursor = self.conn.cursor()
-			# Correcting the query to use a placeholder instead of a literal string
+			updated = self.worker.submit(job, flush=True).result()
+			self.catalog.invalidate()
+			if column in ("item_name", "item_price"):
+				# Cached carts hold the old name and price; reloading reprices them from items
+				self.carts.clear()
+			return updated
+		except sqlite3.Error as e:
+			print(f"ERROR   : sqlite3 error: {e}")
+			return False
+
+	def update_item_stock(self, item_id, item_stock):
+		return self._update_item(item_id, "item_stock", item_stock)
+
+	def update_item_price(self, item_id, item_price):
+		return self._update_item(item_id, "item_price", item_price)
+
+	def update_item_barcode(self, item_id, barcode):
+		return self._update_item(item_id, "barcode", barcode or None)
+
+	def get_sale_products(self, sale_id):
+		def job(conn):
+			cursor = conn.cursor()
 			cursor.execute("""
 				SELECT * FROM cart_items WHERE sale_id = ?
 				""", (sale_id, ))
-		except sqlite3.Error as e:
-			print(f"ERROR   : sqlite3 error: {e}")
+			return cursor.fetchall()
+		return self.worker.read(job)
+
+	def get_cart(self, sale_id):
+		"""
+		Returns the in-memory Cart of a sale, loading it from cart_items
+		(with discounts re-applied) the first time the sale is touched.
+		"""
+		self.drop_failed_carts()
+		cart = self.carts.get(sale_id)
+		if cart is not None:
+			return cart
+		rows = self.worker.call(self._read_cart_lines, [sale_id])
+		return self._build_cart(sale_id, rows)
+
+	@staticmethod
+	def _read_cart_lines(conn, sale_ids):
+		return conn.execute(SELECT_CART_LINES.format(",".join("?" * len(sale_ids))), sale_ids).fetchall()
+
+	def _build_cart(self, sale_id, rows):
+		"""Builds and caches a sale's Cart from its cart_items rows, re-applying discounts."""
+		cart = Cart(sale_id)
+		campaigns = self.get_campaigns()
+		stale = False
+		for _, item_id, item_name, item_price, item_count, stored_discount, stored_total in rows:
+			line = cart.add(CartLine(item_id, item_name, item_price), item_count, campaigns)
+			stale = stale or (line.item_discount_num, line.item_total) != (stored_discount, stored_total)
+		self.carts.put(cart)
+		if stale:
+			# Prices or campaigns changed since the cart was last written
+			self._save_cart(cart)
+		return cart
+
+	def prefetch_carts_async(self, sale_ids):
+		"""
+		Reads the carts of the given sales that are not in memory yet in one
+		query on the worker. Returns a Future of the rows, or None if every
+		cart is already cached; hand the rows to install_prefetched() on the
+		GUI thread.
+		"""
+		missing = [sale_id for sale_id in sale_ids if sale_id not in self.carts][:self.carts.size // 2]
+		if not missing:
+			return None
+		generation = self.carts.generation
+		def job(conn):
+			return generation, missing, self._read_cart_lines(conn, missing)
+		return self.worker.read(job)
+
+	def install_prefetched(self, result):
+		"""
+		Caches the carts read by prefetch_carts_async(). A cart that was
+		loaded or changed meanwhile is kept, and the whole batch is dropped if
+		any cart was invalidated after the read was queued.
+		"""
+		generation, sale_ids, rows = result
+		if generation != self.carts.generation:
+			return
+		by_sale = {sale_id: list(lines) for sale_id, lines in groupby(rows, key=lambda row: row[0])}
+		for sale_id in sale_ids:
+			if sale_id not in self.carts:
+				self._build_cart(sale_id, by_sale.get(sale_id, ()))
+
+	def cart_snapshot(self, sale_id):
+		"""Returns the current CartSnapshot of a sale (EMPTY_SNAPSHOT when there is no sale)."""
+		try:
+			if sale_id is None:
+				return EMPTY_SNAPSHOT
+			return self.get_cart(sale_id).snapshot()
+		except Exception as e:
+			print(f"ERROR   : Building cart snapshot: {e}")
+			return EMPTY_SNAPSHOT
 
 	def total_amount_calculator(self, sale_id):
 		try:
-			cursor_total = self.conn.cursor()
-			cursor_total.execute("""
-				SELECT item_total FROM cart_items WHERE sale_id = ?
-				""", (sale_id, ))
-			item_total_tuple = cursor_total.fetchall()
-			if not item_total_tuple:
+			if sale_id is None:
 				return 0
-			total = 0
-			for i in item_total_tuple:
-				total = total + i[0]
-			return total
+			return self.get_cart(sale_id).total
 		except Exception as e:
 			print(f"ERROR   : {e}")
-			self.conn.rollback()
 			return 0
 
 	def total_discount_num(self, sale_id):
 		try:
-			cursor = self.conn.cursor()
-			cursor.execute("""
-				SELECT total_discount_num
-				FROM sales
-				WHERE sale_id = ?
-			""", (sale_id,))
-			row = cursor.fetchone()
-			return row[0] if row else 0
+			if sale_id is None:
+				return 0
+			return self.get_cart(sale_id).discount_total
 		except Exception as e:
 			print(f"ERROR   : {e}")
-			self.conn.rollback()
 			return 0
 
+	def _save_cart(self, cart):
+		"""Queues a write of every line of the cart plus the sale totals (in one executemany)."""
+		sale_id = cart.sale_id
+		totals = (cart.discount_total, cart.total, sale_id)
+		updates = [(line.item_count, line.item_discount_perc, line.item_discount_num, line.item_total, sale_id, line.item_id)
+			for line in cart.lines.values()]
+		def job(conn):
+			conn.executemany(UPDATE_CART_LINE, updates)
+			conn.execute(UPDATE_SALE_TOTALS, totals)
+		return self._write(job, "Saving cart", sale_id=sale_id)
+
 	def add_item_to_cart(self, sale_id, item_id, item_count, item_discount_perc, item_discount_num):
+		"""
+		Adds item_count of an item to the sale's in-memory cart, reprices only
+		that line and queues a write of the changed line plus the sale totals.
+		Campaign discounts take precedence over the manual discount arguments,
+		as apply_discounts always did.
+		"""
+		return self.add_items_to_cart(sale_id, [(item_id, item_count)])
+
+	def add_items_to_cart(self, sale_id, items):
+		"""
+		Adds a batch of (item_id, count) pairs to the sale's cart. Repeated
+		items are merged, each touched line is repriced once, and the lines
+		plus the sale totals are written by a single worker job, so the batch
+		is committed (or rolled back) as a whole. Unknown items and counts
+		below 1 are logged and skipped. Returns True if anything was added.
+		"""
 		try:
-			cur = self.conn.cursor()
-			cur.execute("""
-				SELECT ci.item_count, ci.item_total, i.item_price
-				FROM cart_items ci
-				JOIN items i ON ci.item_id = i.item_id
-				WHERE ci.sale_id = ? AND ci.item_id = ?
-			""", (sale_id, item_id))
-			row = cur.fetchone()
-
-			if row:
-				new_count = row[0] + item_count
-				new_total = row[1] + (item_count * row[2])
-				cur.execute("""
-					UPDATE cart_items
-					SET item_count = ?,
-						item_total = ?
-					WHERE sale_id = ? AND item_id = ?
-				""", (new_count, new_total, sale_id, item_id))
-				self.conn.commit()  # <-- missing before
-				return True
-
-			# insert path (unchanged)
-			cur.execute("""SELECT item_price FROM items WHERE item_id = ?""", (item_id,))
-			price_row = cur.fetchone()
-			if not price_row:
-				print(f"ERROR:   Item ID not found: {item_id}")
+			counts = {}
+			for item_id, count in items:
+				if count < 1:
+					print(f"ERROR:   Invalid count {count} for item ID {item_id}")
+					continue
+				counts[item_id] = counts.get(item_id, 0) + count
+			cart = self.get_cart(sale_id)
+			campaigns = self.get_campaigns()
+			inserts = []
+			updates = []
+			for item_id, count in counts.items():
+				line = cart.lines.get(item_id)
+				is_new = line is None
+				if is_new:
+					item_row = self.get_item(item_id)
+					if not item_row:
+						print(f"ERROR:   Item ID not found: {item_id}")
+						continue
+					line = CartLine(item_id, item_row["item_name"], item_row["item_price"])
+				cart.add(line, count, campaigns)
+				values = (line.item_count, line.item_discount_perc, line.item_discount_num, line.item_total, sale_id, item_id)
+				(inserts if is_new else updates).append(values)
+			if not inserts and not updates:
 				return False
 
-			base_price = price_row[0]
-			line_total = base_price
-			if item_discount_perc:
-				line_total = line_total * (100 - item_discount_perc) / 100.0
-			if item_discount_num:
-				line_total = line_total - item_discount_num
-
-			cur.execute("""
-				INSERT INTO cart_items (sale_id, item_id, item_count, item_discount_perc, item_discount_num, item_total)
-				VALUES (?, ?, ?, ?, ?, ?)
-			""", (sale_id, item_id, item_count, item_discount_perc, item_discount_num, line_total * item_count))
-			self.conn.commit()
+			totals = (cart.discount_total, cart.total, sale_id)
+			def job(conn):
+				if inserts:
+					conn.executemany(INSERT_CART_LINE, inserts)
+				if updates:
+					conn.executemany(UPDATE_CART_LINE, updates)
+				conn.execute(UPDATE_SALE_TOTALS, totals)
+			self._write(job, "Adding items to cart", sale_id=sale_id)
 			return True
 		except Exception as e:
 			print(f"ERROR   : {e}")
-			self.conn.rollback()
+			self.carts.pop(sale_id, None)
 			return False
 
 	def apply_discounts(self, sale_id):
@@ -152,91 +673,18 @@ class DatabaseManager:
 		write item_discount_* and item_total (net), then update sales.* totals.
 		"""
 		try:
-			cur = self.conn.cursor()
-
-			# 1) Recompute each cart row from base values so discounts don’t compound
-			cur.execute("""
-				SELECT ci.item_id, ci.item_count, i.item_price
-				FROM cart_items ci
-				JOIN items i ON i.item_id = ci.item_id
-				WHERE ci.sale_id = ?
-			""", (sale_id,))
-			rows = cur.fetchall()
-
-			for item_id, item_count, item_price in rows:
-				base_total = (item_price or 0) * (item_count or 0)
-
-				# fetch best (or only) campaign; if you may have many, pick the best here
-				cur.execute("""
-					SELECT disc_type, disc_val, min_quan
-					FROM campaigns
-					WHERE item_id = ?
-					AND min_quan <= ?
-					ORDER BY min_quan DESC
-					LIMIT 1
-				""", (item_id, item_count))
-				camp = cur.fetchone()
-
-				discount_num = 0.0
-				discount_perc = 0.0
-				if camp and item_count >= camp["min_quan"]:
-					if camp["disc_type"] == "percent":
-						discount_num = base_total * (camp["disc_val"] / 100.0)
-						discount_perc = camp["disc_val"]
-					elif camp["disc_type"] == "fixed":
-						discount_num = min(base_total, camp["disc_val"])  # don’t go negative
-						discount_perc = (discount_num / base_total * 100.0) if base_total > 0 else 0.0
-
-				new_total = max(0.0, base_total - discount_num)
-
-				cur.execute("""
-					UPDATE cart_items
-					SET item_discount_perc = ?,
-						item_discount_num  = ?,
-						item_total         = ?
-					WHERE sale_id = ? AND item_id = ?
-				""", (discount_perc, discount_num, new_total, sale_id, item_id))
-
-			# 2) Write aggregated totals into sales so your "İNDİRİM:" label reflects reality
-			cur.execute("""
-				SELECT COALESCE(SUM(item_discount_num), 0.0),
-					COALESCE(SUM(item_total), 0.0)
-				FROM cart_items
-				WHERE sale_id = ?
-			""", (sale_id,))
-			disc_sum, total_sum = cur.fetchone() or (0.0, 0.0)
-
-			cur.execute("""
-				UPDATE sales
-				SET total_discount_num = ?,
-					total_amount       = ?
-				WHERE sale_id = ?
-			""", (disc_sum, total_sum, sale_id))
-
-			self.conn.commit()
+			cart = self.get_cart(sale_id)
+			campaigns = self.get_campaigns()
+			for line in cart.lines.values():
+				cart.reprice(line, campaigns)
+			return self._save_cart(cart)
 		except Exception as e:
 			print(f"ERROR   : Applying discounts: {e}")
-			self.conn.rollback()
 
 
 	def get_cart_items(self, sale_id):
 		try:
-			# Apply first, then fetch
-			self.apply_discounts(sale_id)
-
-			cursor = self.conn.cursor()
-			cursor.execute("""
-				SELECT
-					ci.item_count,
-					i.item_name,
-					ci.item_discount_perc,
-					ci.item_discount_num,
-					ci.item_total
-				FROM cart_items AS ci
-				JOIN items  AS i  ON ci.item_id = i.item_id
-				WHERE ci.sale_id = ?
-			""", (sale_id,))
-			return cursor.fetchall()
+			return list(self.cart_snapshot(sale_id).lines)
 		except Exception as e:
 			print(f"ERROR   : Fetching cart items: {e}")
 			return []
@@ -244,63 +692,72 @@ class DatabaseManager:
 
 	def remove_item_from_cart(self, sale_id, i):
 		try:
-			cart_items = get_cart_items(sale_id)
-			cursor = self.conn.cursor()
-			cursor.execute("""
-				DELETE FROM cart_items
-				WHERE cart_items_id = ?
-			""", (cart_items[i][0], ))
-			self.conn.commit()
+			cart = self.get_cart(sale_id)
+			item_id = list(cart.lines)[i]
+			cart.remove(item_id)
+			totals = (cart.discount_total, cart.total, sale_id)
+			def job(conn):
+				conn.execute("""
+					DELETE FROM cart_items
+					WHERE sale_id = ? AND item_id = ?
+				""", (sale_id, item_id))
+				conn.execute(UPDATE_SALE_TOTALS, totals)
+			self._write(job, "Removing selected cart item", sale_id=sale_id)
 			return True
 		except Exception as e:
 				print(f"ERROR   : Removing selected cart item: {e}")
+				self.carts.pop(sale_id, None)
 				return False
 	
 	def remove_cart_of_sale(self, sale_id):
-		try:
-			cursor = self.conn.cursor()
-			cursor.execute("""
+		self.carts.pop(sale_id, None)
+		def job(conn):
+			conn.execute("""
 				DELETE FROM cart_items
 				WHERE sale_id = ?
 			""", (sale_id, ))
-			self.conn.commit()
-			cursor = self.conn.cursor()
-			cursor.execute("""
+			conn.execute("""
 				DELETE FROM sales
 				WHERE sale_id = ?
 			""", (sale_id, ))
-			self.conn.commit()
-		except Exception as e:
-			print(f"ERROR   : Removing cart of sale: {e}")
+		return self._write(job, "Removing cart of sale", flush=True)
+
+	def update_sale_payment_info(self, sale_id, payment_method, payment_info=None):
+		"""Closes the sale with its payment method and commits everything queued for it."""
+		cart = self.carts.pop(sale_id, None)
+		totals = (cart.discount_total, cart.total, sale_id) if cart else None
+		def job(conn):
+			if totals:
+				conn.execute(UPDATE_SALE_TOTALS, totals)
+			conn.execute("""
+				UPDATE sales
+				SET payment_method = ?,
+					payment_info   = ?
+				WHERE sale_id = ?
+			""", (payment_method, payment_info, sale_id))
+		print(f"PAYMENT : {sale_id} | {payment_method}")
+		return self._write(job, "Saving payment info", flush=True)
+
+	def onhold_orders_async(self):
+		"""
+		Future of the WIP (on-hold) sales, newest first, as rows of
+		sale_id, customer_name and total_amount (read from idx_sales_onhold).
+		"""
+		def job(conn):
+			cursor = conn.cursor()
+			cursor.execute(SELECT_ONHOLD_ORDERS)
+			return cursor.fetchall()
+		return self.worker.read(job)
+
 	def	onhold_orders(self):
 		try:
-			cursor = self.conn.cursor()
-			cursor.execute("""
-				SELECT *
-				FROM sales
-				WHERE payment_method = "WIP"
-			""")
-			return (cursor.fetchall())
+			return self.onhold_orders_async().result()
 		except Exception as e:
 			print(f"ERROR   : Getting onhold orders' list: {e}")
 
 	def calculate_cart_discount(self, sale_id):
 		try:
-			cursor = self.conn.cursor()
-			cursor.execute("""
-				SELECT item_id, item_count
-				FROM cart_items
-				WHERE sale_id = ?
-			""", (sale_id,))
-			
-			cart_items = cursor.fetchall()
-			total_discount = 0
-			
-			for item_id, count in cart_items:
-				discount = self.get_applicable_discount(item_id, count)
-				total_discount += discount
-			
-			return total_discount
+			return self.get_cart(sale_id).discount_total
 		except Exception as e:
 			print(f"ERROR in calculate_cart_discount: {e}")
 			return 0
@@ -0,0 +1,165 @@
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+from connections import connect_writer
+
+# Job kinds
+READ = 0
+WRITE = 1
+FLUSH = 2
+
+class DatabaseWorker:
+	"""
+	A dedicated thread that owns the SQLite writer connection.
+	Jobs are callables that take the connection as their first argument and
+	run one at a time in submission order; every call hands back a
+	concurrent.futures.Future for the job's return value.
+
+	Writes use group commit: each write runs inside its own savepoint (so a
+	failing job only undoes itself) and the surrounding transaction is
+	committed once commit_delay seconds after its first write, or earlier
+	when flush() is requested. A write's future resolves once it has been
+	committed. With commit_delay=0 every write is committed on its own.
+	Reads run on the same connection, so they see queued writes right away.
+	"""
+	def __init__(self, db_name, commit_delay=0.0, name="db-worker"):
+		self.db_name = db_name
+		self.commit_delay = commit_delay
+		self.jobs = queue.SimpleQueue()
+		self.ready = threading.Event()
+		self.error = None
+		# Optional Instrumentation: jobs are attributed to the action that queued them
+		self.tracer = None
+		self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+		self.thread.start()
+		self.ready.wait()
+		if self.error:
+			raise self.error
+
+	def _put(self, kind, fn, args):
+		future = Future()
+		action = self.tracer.current if self.tracer else None
+		self.jobs.put((kind, future, fn, args, action))
+		return future
+
+	def submit(self, fn, *args, flush=False):
+		"""Queues a write; flush=True commits it (and everything before it) without waiting for commit_delay."""
+		future = self._put(WRITE, fn, args)
+		if flush:
+			self.flush()
+		return future
+
+	def read(self, fn, *args):
+		"""Queues a read; its future resolves as soon as it has run."""
+		return self._put(READ, fn, args)
+
+	def call(self, fn, *args):
+		"""Runs a read and waits for its result; meant for data the caller cannot do without."""
+		return self.read(fn, *args).result()
+
+	def flush(self):
+		"""Commits every write queued so far; the returned future resolves after the commit."""
+		return self._put(FLUSH, None, ())
+
+	def close(self):
+		if self.thread.is_alive():
+			self.jobs.put(None)
+			self.thread.join()
+
+	def _connect(self):
+		# Transactions are opened and committed explicitly by _run
+		return connect_writer(self.db_name, isolation_level=None)
+
+	def _commit(self, conn, pending):
+		if self.tracer and pending:
+			# The commit is accounted to the action of the oldest write it makes durable
+			self.tracer.job_action = pending[0][2]
+		try:
+			if conn.in_transaction:
+				conn.execute("COMMIT")
+		except sqlite3.Error as e:
+			if conn.in_transaction:
+				conn.execute("ROLLBACK")
+			for future, result, action in pending:
+				future.set_exception(e)
+		else:
+			for future, result, action in pending:
+				future.set_result(result)
+		pending.clear()
+		if self.tracer:
+			self.tracer.job_action = None
+
+	def _run_write(self, conn, fn, args):
+		if not conn.in_transaction:
+			conn.execute("BEGIN")
+		conn.execute("SAVEPOINT job")
+		try:
+			result = fn(conn, *args)
+		except BaseException:
+			conn.execute("ROLLBACK TO job")
+			conn.execute("RELEASE job")
+			raise
+		conn.execute("RELEASE job")
+		return result
+
+	def _run(self):
+		try:
+			conn = self._connect()
+		except sqlite3.Error as e:
+			self.error = e
+			self.ready.set()
+			return
+		self.ready.set()
+		pending = []  # (future, result, action) of writes that ran but are not committed yet
+		deadline = None
+		try:
+			while True:
+				if deadline is not None and time.monotonic() >= deadline:
+					# The commit window is up: commit before taking another job,
+					# even while jobs keep arriving faster than they run
+					self._commit(conn, pending)
+					deadline = None
+				try:
+					timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+					job = self.jobs.get(timeout=timeout)
+				except queue.Empty:
+					self._commit(conn, pending)
+					deadline = None
+					continue
+				if job is None:
+					break
+				kind, future, fn, args, action = job
+				if not future.set_running_or_notify_cancel():
+					continue
+				if kind == FLUSH:
+					self._commit(conn, pending)
+					deadline = None
+					future.set_result(None)
+					continue
+				if self.tracer:
+					self.tracer.job_action = action
+				try:
+					if kind == READ:
+						result = fn(conn, *args)
+					else:
+						result = self._run_write(conn, fn, args)
+				except BaseException as e:
+					future.set_exception(e)
+					continue
+				finally:
+					if self.tracer:
+						self.tracer.job_action = None
+				if kind == READ:
+					future.set_result(result)
+					continue
+				pending.append((future, result, action))
+				if self.commit_delay <= 0:
+					self._commit(conn, pending)
+				elif deadline is None:
+					deadline = time.monotonic() + self.commit_delay
+		finally:
+			self._commit(conn, pending)
+			conn.close()
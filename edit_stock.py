@@ -1,5 +1,6 @@
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QPushButton, QLabel
 from PySide6.QtCore import Qt, Signal
+from theme import set_role
 
 class EditStockScreen(QWidget):
     """
@@ -13,31 +14,10 @@ class EditStockScreen(QWidget):
         layout = QVBoxLayout()
         layout.setAlignment(Qt.AlignCenter)
 
-        title = QLabel("Stok Düzenle Ekranı")
-        title.setStyleSheet("""
-            font-size: 72px;
-            font-weight: bold;
-            color: white;
-        """)
+        title = set_role(QLabel("Stok Düzenle Ekranı"), "title")
         title.setAlignment(Qt.AlignCenter)
         
-        self.back_button = QPushButton("Geri")
-        self.back_button.setStyleSheet("""
-            QPushButton {
-                background-color: #2c3e50;
-                color: white;
-                font-size: 48px;
-                font-weight: bold;
-                padding: 20px;
-                border-radius: 10px;
-                width: 450px;
-                height: 80px;
-                border: 2px solid white;
-            }
-            QPushButton:hover {
-                background-color: #34495e;
-            }
-        """)
+        self.back_button = set_role(QPushButton("Geri"), "action")
 
         layout.addWidget(title)
         layout.addWidget(self.back_button)
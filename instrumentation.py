@@ -0,0 +1,189 @@
+# Opt-in timing and SQL accounting per user action.
+#
+# When enabled (POSTRINK_INSTRUMENT=1), the outermost instrumented call
+# becomes an "action" (e.g. CartScreen.handle_product_click) and every
+# instrumented call made while it runs is recorded as a span of it. The
+# SQL statements, fetched rows and commits executed on the database
+# worker on behalf of the action are counted too, even when the writes
+# land after the action has returned. Finished actions are kept in a ring
+# buffer that can be dumped to a JSON file; actions slower than the
+# threshold are logged together with the SQL they ran.
+
+import functools
+import json
+import os
+import sqlite3
+import time
+from collections import deque
+from contextlib import contextmanager
+
+MAX_SQL_PER_ACTION = 50
+
+class ActionRecord:
+	__slots__ = ("name", "started", "wall_ms", "statements", "rows", "commits", "spans", "sql")
+
+	def __init__(self, name):
+		self.name = name
+		self.started = time.time()
+		self.wall_ms = None
+		self.statements = 0
+		self.rows = 0
+		self.commits = 0
+		self.spans = {}
+		self.sql = []
+
+	def as_dict(self):
+		return {slot: getattr(self, slot) for slot in self.__slots__}
+
+class Instrumentation:
+	def __init__(self, capacity=1000, slow_ms=50.0):
+		self.enabled = False
+		self.slow_ms = slow_ms
+		self.records = deque(maxlen=capacity)
+		self.current = None   # action running on the GUI thread
+		self.job_action = None  # action of the job running on the database worker
+
+	def enable(self, slow_ms=None):
+		self.enabled = True
+		if slow_ms is not None:
+			self.slow_ms = slow_ms
+
+	def timed(self, name, fn):
+		"""Wraps fn so each call is an action, or a span of the action already running."""
+		@functools.wraps(fn)
+		def wrapper(*args, **kwargs):
+			if not self.enabled:
+				return fn(*args, **kwargs)
+			outer = self.current
+			if outer is None:
+				self.current = ActionRecord(name)
+			start = time.perf_counter()
+			try:
+				return fn(*args, **kwargs)
+			finally:
+				elapsed = (time.perf_counter() - start) * 1000.0
+				if outer is None:
+					record = self.current
+					self.current = None
+					self._finish(record, elapsed)
+				else:
+					outer.spans[name] = outer.spans.get(name, 0.0) + elapsed
+		return wrapper
+
+	def instrument(self, cls, names, prefix=None):
+		"""Replaces the named methods of cls by timed wrappers."""
+		prefix = prefix or cls.__name__
+		for name in names:
+			setattr(cls, name, self.timed(f"{prefix}.{name}", getattr(cls, name)))
+
+	def _finish(self, record, wall_ms):
+		record.wall_ms = wall_ms
+		self.records.append(record)
+		if wall_ms >= self.slow_ms:
+			print(f"SLOW    : {record.name} took {wall_ms:.1f} ms "
+				f"({record.statements} statements, {record.rows} rows, {record.commits} commits)")
+			for span, ms in sorted(record.spans.items(), key=lambda kv: -kv[1]):
+				print(f"          {ms:8.1f} ms  {span}")
+			for sql in record.sql:
+				print(f"          SQL: {' '.join(sql.split())}")
+
+	# --- database side: hooks installed on the worker connection ---
+
+	def attach(self, conn):
+		"""Worker job that installs the statement and row counters on the connection."""
+		conn.set_trace_callback(self._trace)
+		def count_rows(cursor, row):
+			record = self.job_action or self.current
+			if record is not None:
+				record.rows += 1
+			return sqlite3.Row(cursor, row)
+		conn.row_factory = count_rows
+
+	def _trace(self, sql):
+		record = self.job_action or self.current
+		if record is None:
+			return
+		word = sql.lstrip()[:9].upper()
+		if word.startswith("COMMIT"):
+			record.commits += 1
+		elif not word.startswith(("BEGIN", "SAVEPOINT", "RELEASE", "ROLLBACK")):
+			record.statements += 1
+			if len(record.sql) < MAX_SQL_PER_ACTION:
+				record.sql.append(sql)
+
+	def dump(self, path):
+		with open(path, "w") as f:
+			json.dump([record.as_dict() for record in self.records], f, indent=1, ensure_ascii=False)
+		print(f"INSTR   : {len(self.records)} actions written to {path}")
+
+instrumentation = Instrumentation()
+
+def enable_from_env():
+	"""Turns instrumentation on when POSTRINK_INSTRUMENT is set; POSTRINK_SLOW_MS sets the slow threshold."""
+	if os.environ.get("POSTRINK_INSTRUMENT"):
+		instrumentation.enable(float(os.environ.get("POSTRINK_SLOW_MS", instrumentation.slow_ms)))
+	return instrumentation.enabled
+
+class StartupTrace:
+	"""
+	Wall-clock trace of the boot sequence, on when POSTRINK_STARTUP_TRACE is
+	set. mark() closes a sequential phase (imports, QApplication, ...) and
+	span() times a nested step (a screen, a database call); report() prints
+	them once the main menu is up. Spans finishing after that, such as a
+	screen built on its first use, are printed as they happen.
+	"""
+	def __init__(self):
+		self.enabled = bool(os.environ.get("POSTRINK_STARTUP_TRACE"))
+		self.started = time.perf_counter()
+		self.last = self.started
+		self.entries = []
+		self.depth = 0
+		self.booted = False
+
+	def mark(self, phase):
+		now = time.perf_counter()
+		if self.enabled and not self.booted:
+			self.entries.append((self.last, 0, phase, (now - self.last) * 1000.0))
+		self.last = now
+
+	@contextmanager
+	def span(self, name):
+		if not self.enabled:
+			yield
+			return
+		start = time.perf_counter()
+		self.depth += 1
+		try:
+			yield
+		finally:
+			self.depth -= 1
+			elapsed = (time.perf_counter() - start) * 1000.0
+			if self.booted:
+				print(f"STARTUP : {name} took {elapsed:.1f} ms (first use)")
+			else:
+				self.entries.append((start, self.depth + 1, name, elapsed))
+
+	def timed(self, name, fn):
+		@functools.wraps(fn)
+		def wrapper(*args, **kwargs):
+			with self.span(name):
+				return fn(*args, **kwargs)
+		return wrapper
+
+	def instrument(self, cls, names, prefix=None):
+		"""Replaces the named methods of cls by spans."""
+		prefix = prefix or cls.__name__
+		for name in names:
+			setattr(cls, name, self.timed(f"{prefix}.{name}", getattr(cls, name)))
+
+	def report(self):
+		if not self.enabled or self.booted:
+			return
+		self.mark("first event loop turn")
+		self.booted = True
+		print(f"STARTUP : main menu up {(self.last - self.started) * 1000.0:.1f} ms after start")
+		# Entries are recorded when they end; list them by start, phases before their steps
+		for _, depth, name, ms in sorted(self.entries, key=lambda entry: entry[:2]):
+			print(f"          {ms:8.1f} ms  {'  ' * depth}{name}")
+
+startup_trace = StartupTrace()
@@ -1,23 +1,30 @@
 ### main.py
 
+import os
 import sys
+# Imported first so the startup trace clock starts before the heavy imports
+from instrumentation import instrumentation, enable_from_env, startup_trace
 from PySide6.QtWidgets import (
 	QApplication, QMainWindow, QWidget,
 	QVBoxLayout, QPushButton, QLabel,
 	QHBoxLayout, QStackedWidget, QLineEdit,
 	QMessageBox, QInputDialog
 )
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import Qt, Signal, QTimer
 import random 
 import time
 
 from data import AppData, DatabaseManager
+from qt_async import GuiRelay
+from theme import apply_theme, set_role
 
 from new_sale import NewSaleScreen, CartScreen, CustomerCartScreen
 from view_sales import SalesScreen, WelcomeScreen
 from edit_stock import EditStockScreen
 from onhold_orders import OnHoldOrdersScreen
 
+startup_trace.mark("imports")
+
 class Window1(QMainWindow):
 	"""
 	The main POS window for the employee.
@@ -27,71 +34,102 @@ class Window1(QMainWindow):
 		self.setWindowTitle("Main Window")
 		self.controller = controller
 		self.second_window = second_window
+		# Failed cart writes are reported on the database worker thread
+		controller.database_manager.write_failed = GuiRelay(self.handle_write_failed)
 
 		self.stacked_widget = QStackedWidget()
 		self.setCentralWidget(self.stacked_widget)
-
-		self.setStyleSheet("""
-			QMainWindow {
-				background-color: #111;
-			}
-			QWidget {
-				background-color: #111;
-			}
-		""")
 		
 		self.main_menu_widget = self._create_main_menu()
 		self.stacked_widget.addWidget(self.main_menu_widget)
-		
-		self.new_sale_screen = NewSaleScreen()
-		self.stacked_widget.addWidget(self.new_sale_screen)
-		
-		self.sales_screen = SalesScreen()
-		self.stacked_widget.addWidget(self.sales_screen)
-		
-		self.cart_screen = CartScreen()
-		self.stacked_widget.addWidget(self.cart_screen)
 
-		self.edit_stock_screen = EditStockScreen()
-		self.stacked_widget.addWidget(self.edit_stock_screen)
-
-		self.onhold_screen = OnHoldOrdersScreen(controller)
-		self.stacked_widget.addWidget(self.onhold_screen)
+		# Every other screen is built the first time it is shown
+		self.screens = {}
+		self.screen_builders = {
+			"new_sale": self._build_new_sale_screen,
+			"sales": self._build_sales_screen,
+			"cart": self._build_cart_screen,
+			"edit_stock": self._build_edit_stock_screen,
+			"onhold": self._build_onhold_screen,
+		}
 		
-		self.new_sale_button.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(1))
-		self.sales_button.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(2))
-		self.stock_button.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(4))
-		self.onhold_button.clicked.connect(lambda: [
-			self.onhold_screen.refresh_onhold_sales(),
-			self.stacked_widget.setCurrentIndex(5)
-		])
+		self.new_sale_button.clicked.connect(lambda: self.show_screen("new_sale"))
+		self.sales_button.clicked.connect(lambda: self.show_screen("sales"))
+		self.stock_button.clicked.connect(lambda: self.show_screen("edit_stock"))
+		self.onhold_button.clicked.connect(lambda: self.show_screen("onhold"))
 		self.quit_button.clicked.connect(QApplication.instance().quit)
-		
-		self.new_sale_screen.back_button.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(0))
-		self.new_sale_screen.next_button.clicked.connect(self.start_sale_and_show_cart)
 
-		self.sales_screen.back_button.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(0))
-		self.cart_screen.back_button.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(0))
-		self.onhold_screen.back_button.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(0))
-		self.onhold_screen.continue_sale.connect(self.continue_sale)
-		self.cart_screen.cancel_button.clicked.connect(self.handle_cancel)
-		#self.cart_screen.cancel_button.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(0))
-		self.edit_stock_screen.back_button_clicked.connect(lambda: self.stacked_widget.setCurrentIndex(0))
+		self.showFullScreen()
 
+	def screen(self, name):
+		"""Returns the named screen, building it and adding it to the stack on first use."""
+		screen = self.screens.get(name)
+		if screen is None:
+			with startup_trace.span(f"screen {name}"):
+				screen = self.screen_builders[name]()
+			self.stacked_widget.addWidget(screen)
+			self.screens[name] = screen
+		return screen
+
+	def show_screen(self, name):
+		self.stacked_widget.setCurrentWidget(self.screen(name))
+
+	def show_menu(self):
+		self.stacked_widget.setCurrentWidget(self.main_menu_widget)
+
+	new_sale_screen = property(lambda self: self.screen("new_sale"))
+	sales_screen = property(lambda self: self.screen("sales"))
+	cart_screen = property(lambda self: self.screen("cart"))
+	edit_stock_screen = property(lambda self: self.screen("edit_stock"))
+	onhold_screen = property(lambda self: self.screen("onhold"))
+
+	def _build_new_sale_screen(self):
+		screen = NewSaleScreen()
+		screen.back_button.clicked.connect(self.show_menu)
+		screen.back_button.clicked.connect(self.second_window.show_welcome)
+		screen.next_button.clicked.connect(self.start_sale_and_show_cart)
+		return screen
+
+	def _build_sales_screen(self):
+		screen = SalesScreen(self.controller)
+		# Cancel running reports and stop the report thread on exit
+		QApplication.instance().aboutToQuit.connect(screen.close_reports)
+		screen.back_button.clicked.connect(self.show_menu)
+		screen.back_button.clicked.connect(self.second_window.show_welcome)
+		return screen
+
+	def _build_cart_screen(self):
+		screen = CartScreen()
+		screen.back_button.clicked.connect(self.handle_suspend)
+		screen.back_button.clicked.connect(self.second_window.show_welcome)
+		screen.cancel_button.clicked.connect(self.handle_cancel)
 		# Connect the cart screen's item_added signal to the customer display update
-		self.cart_screen.item_added.connect(self.second_window.show_cart)
-
+		screen.item_added.connect(self.second_window.show_cart)
 		# Connect the new payment buttons to their handlers
-		self.cart_screen.cash_button.clicked.connect(self.handle_cash_payment)
-		self.cart_screen.iban_button.clicked.connect(self.handle_iban_payment)
-
-		self.showFullScreen()
+		screen.cash_button.clicked.connect(self.handle_cash_payment)
+		screen.iban_button.clicked.connect(self.handle_iban_payment)
+		return screen
+
+	def _build_edit_stock_screen(self):
+		screen = EditStockScreen()
+		screen.back_button_clicked.connect(self.show_menu)
+		screen.back_button_clicked.connect(self.second_window.show_welcome)
+		return screen
+
+	def _build_onhold_screen(self):
+		screen = OnHoldOrdersScreen(self.controller)
+		screen.back_button.clicked.connect(self.show_menu)
+		screen.continue_sale.connect(self.continue_sale)
+		# Loaded once; afterwards the list is kept current by sale_suspended/sale_closed
+		screen.refresh_onhold_sales()
+		return screen
 
 	def handle_cash_payment(self):
 		"""Handles the cash payment and completes the sale."""
 		if self.controller.curr_sale_id:
 			self.controller.database_manager.update_sale_payment_info(self.controller.curr_sale_id, "Nakit")
-			self.stacked_widget.setCurrentIndex(0)
+			self.onhold_sale_closed(self.controller.curr_sale_id)
+			self.show_menu()
 			self.second_window.show_welcome()
 
 	def handle_iban_payment(self):
@@ -100,7 +138,8 @@ class Window1(QMainWindow):
 			sender_name, ok = QInputDialog.getText(self, "IBAN Bilgisi", "Göndericinin Adı:")
 			if ok and sender_name:
 				self.controller.database_manager.update_sale_payment_info(self.controller.curr_sale_id, "IBAN", sender_name)
-				self.stacked_widget.setCurrentIndex(0)
+				self.onhold_sale_closed(self.controller.curr_sale_id)
+				self.show_menu()
 				self.second_window.show_welcome()
 			else:
 				# Handle the case where the user cancels the input or enters nothing
@@ -110,11 +149,38 @@ class Window1(QMainWindow):
 				msg_box.setIcon(QMessageBox.Warning)
 				msg_box.exec()
 
+	def handle_suspend(self):
+		"""Puts the sale on hold; its queued cart changes are committed right away."""
+		controller = self.controller
+		controller.database_manager.flush()
+		if "onhold" in self.screens:
+			snapshot = controller.database_manager.cart_snapshot(controller.curr_sale_id)
+			self.onhold_screen.sale_suspended(controller.curr_sale_id, controller.curr_customer_name, snapshot.total)
+		self.show_menu()
+
 	def handle_cancel(self):
 		self.controller.database_manager.remove_cart_of_sale(self.controller.curr_sale_id)
-		self.stacked_widget.setCurrentIndex(0)
+		self.onhold_sale_closed(self.controller.curr_sale_id)
+		self.show_menu()
 		self.second_window.show_welcome()
 
+	def handle_write_failed(self, sale_id):
+		"""Reloads carts whose writes were rolled back and redraws the open sale if it was one of them."""
+		controller = self.controller
+		# Another get_cart() may already have dropped the cart; redraw either way
+		controller.database_manager.drop_failed_carts()
+		cart_screen = self.screens.get("cart")
+		showing_sale = cart_screen is not None and self.stacked_widget.currentWidget() is cart_screen
+		if showing_sale and sale_id == controller.curr_sale_id:
+			snapshot = controller.database_manager.cart_snapshot(sale_id)
+			cart_screen.refresh_cart_items(controller, snapshot)
+			self.second_window.show_cart(snapshot)
+
+	def onhold_sale_closed(self, sale_id):
+		"""Drops a paid or cancelled sale from the on-hold list, if that screen has been built."""
+		if "onhold" in self.screens:
+			self.onhold_screen.sale_closed(sale_id)
+
 	def _create_main_menu(self):
 		main_menu_widget = QWidget()
 		main_menu_layout = QVBoxLayout()
@@ -126,95 +192,15 @@ class Window1(QMainWindow):
 		self.onhold_button = QPushButton("Askıdakiler")
 		self.quit_button = QPushButton("Çıkış")
 		
-		new_sale_style = """
-			QPushButton {
-				background-color: #27ae60; 
-				border: 2px solid #229954; 
-				color: white;
-				font-size: 48px;
-				font-weight: bold;
-				padding: 20px;
-				border-radius: 10px;
-				width: 500px;
-				height: 80px;
-			}
-			QPushButton:hover {
-				border: 5px solid #999;
-			}
-		"""
-		
-		sales_style = """
-			QPushButton {
-				background-color: #f39c12; 
-				border: 2px solid #e67e22; 
-				color: white;
-				font-size: 48px;
-				font-weight: bold;
-				padding: 20px;
-				border-radius: 10px;
-				width: 500px;
-				height: 80px;
-			}
-			QPushButton:hover {
-				border: 5px solid #999;
-			}
-		"""
-
-		stock_style = """
-			QPushButton {
-				background-color: #3498db; 
-				border: 2px solid #2980b9; 
-				color: white;
-				font-size: 48px;
-				font-weight: bold;
-				padding: 20px;
-				border-radius: 10px;
-				width: 500px;
-				height: 80px;
-			}
-			QPushButton:hover {
-				border: 5px solid #999;
-			}
-		"""
-		onhold_style = """
-			QPushButton {
-				background-color: #C27D0E; 
-				border: 2px solid #c0392b; 
-				color: white;
-				font-size: 48px;
-				font-weight: bold;
-				padding: 20px;
-				border-radius: 10px;
-				width: 500px;
-				height: 80px;
-			}
-			QPushButton:hover {
-				border: 5px solid #999;
-			}
-		"""
-
-		quit_style = """
-			QPushButton {
-				background-color: #e74c3c; 
-				border: 2px solid #c0392b; 
-				color: white;
-				font-size: 48px;
-				font-weight: bold;
-				padding: 20px;
-				border-radius: 10px;
-				width: 500px;
-				height: 80px;
-			}
-			QPushButton:hover {
-				border: 5px solid #999;
-			}
-		"""
-
-		self.new_sale_button.setStyleSheet(new_sale_style)
-		self.sales_button.setStyleSheet(sales_style)
-		self.stock_button.setStyleSheet(stock_style)
-		self.onhold_button.setStyleSheet(onhold_style)
-		self.quit_button.setStyleSheet(quit_style)
+		for button, name in (
+			(self.new_sale_button, "newSaleButton"),
+			(self.sales_button, "salesButton"),
+			(self.stock_button, "stockButton"),
+			(self.onhold_button, "onholdButton"),
+			(self.quit_button, "quitButton"),
+		):
+			button.setObjectName(name)
+			set_role(button, "menu")
 
 		self.new_sale_button.setShortcut("n")
 		self.sales_button.setShortcut("v")
@@ -253,34 +239,30 @@ class Window1(QMainWindow):
 
 		# Refresh both the employee and customer cart screens when a new sale starts
 		self.cart_screen.refresh_data(self.controller)
-		self.stacked_widget.setCurrentIndex(3)
+		self.show_screen("cart")
 		self.second_window.show_cart()
 
-	def continue_sale(self, selected_id):
+	def continue_sale(self, selected_id, cust_name):
+		# The on-hold screen passes the customer name from its list and the
+		# cart is usually prefetched, so the cart is shown without a database read
 		try:
-			cursor = self.controller.database_manager.conn.cursor()
-			cursor.execute("""
-				SELECT customer_name FROM
-				sales
-				WHERE sale_id = ?
-			""", (selected_id, ))
-			cust_name = cursor.fetchone()
-			if cust_name:
-				self.controller.curr_customer_name = cust_name[0]
-			else:
-				print(f"Sale {selected_id} not found in sales table!")
-				return
-			self.controller.curr_customer_name = cust_name[0]
+			self.controller.curr_customer_name = cust_name
 			self.controller.curr_sale_id = selected_id
 			self.cart_screen.refresh_data(self.controller)
-			self.stacked_widget.setCurrentIndex(3)
+			self.show_screen("cart")
 			self.second_window.show_cart()
 		except Exception as e:
 			print(f"ERROR   : {e}")
 
+# Minimum time between two repaints of the customer display (~60 Hz)
+CUSTOMER_FRAME_MS = 16
+
 class Window2(QMainWindow):
 	"""
 	The customer-facing display window.
+	Cart changes are coalesced: show_cart() only records the latest
+	snapshot, and the display is repainted from it at most once per
+	CUSTOMER_FRAME_MS however fast the cashier taps.
 	"""
 	def __init__(self, controller):
 		super().__init__()
@@ -289,37 +271,101 @@ class Window2(QMainWindow):
 		
 		self.stacked_widget = QStackedWidget()
 		self.setCentralWidget(self.stacked_widget)
-		self.setStyleSheet("background-color: #111;")
 		
 		self.welcome_screen = WelcomeScreen()
 		self.stacked_widget.addWidget(self.welcome_screen)
-		
-		from new_sale import CustomerCartScreen
-		self.customer_cart_screen = CustomerCartScreen(controller)
-		self.stacked_widget.addWidget(self.customer_cart_screen)
+		# The cart screen is built when the first sale is shown
+		self._customer_cart_screen = None
+
+		self.pending_snapshot = None
+		self.frame_timer = QTimer(self)
+		self.frame_timer.setSingleShot(True)
+		self.frame_timer.setInterval(CUSTOMER_FRAME_MS)
+		self.frame_timer.timeout.connect(self.render_cart)
 
 		self.showFullScreen()
+
+	@property
+	def customer_cart_screen(self):
+		if self._customer_cart_screen is None:
+			with startup_trace.span("screen customer_cart"):
+				self._customer_cart_screen = CustomerCartScreen(self.controller)
+			self.stacked_widget.addWidget(self._customer_cart_screen)
+		return self._customer_cart_screen
 	
 	def show_welcome(self):
-		self.stacked_widget.setCurrentIndex(0)
-
-	def show_cart(self):
-		# This method is now called whenever the main cart is updated
-		self.customer_cart_screen.refresh_data(self.controller)
-		self.stacked_widget.setCurrentIndex(1)
+		# Drop a cart repaint still pending from before the sale ended
+		self.frame_timer.stop()
+		self.pending_snapshot = None
+		self.stacked_widget.setCurrentWidget(self.welcome_screen)
+
+	def show_cart(self, snapshot=None):
+		# This method is now called whenever the main cart is updated,
+		# with the same CartSnapshot the cashier screen just rendered.
+		# Only the latest one is kept until the next frame.
+		self.pending_snapshot = snapshot
+		if not self.frame_timer.isActive():
+			self.frame_timer.start()
+
+	def render_cart(self):
+		"""Repaints the customer display from the latest snapshot (the current cart if none was given)."""
+		snapshot, self.pending_snapshot = self.pending_snapshot, None
+		self.customer_cart_screen.refresh_data(self.controller, snapshot)
+		self.stacked_widget.setCurrentWidget(self.customer_cart_screen)
 		
+def install_instrumentation():
+	"""
+	Wraps the data access methods and the screen refresh paths with
+	timers. Must run before any window or DatabaseManager is created.
+	"""
+	instrumentation.instrument(DatabaseManager, [
+		"start_new_sale", "get_all_products", "get_cart", "cart_snapshot",
+		"add_item_to_cart", "add_items_to_cart", "get_item_by_code", "apply_discounts", "get_cart_items",
+		"remove_item_from_cart", "remove_cart_of_sale", "onhold_orders",
+		"prefetch_carts_async", "install_prefetched", "update_sale_payment_info", "flush",
+	])
+	instrumentation.instrument(CartScreen, ["handle_product_click", "apply_scans", "refresh_data", "load_products", "refresh_cart_items"])
+	instrumentation.instrument(CustomerCartScreen, ["refresh_data", "refresh_cart_items"])
+	instrumentation.instrument(OnHoldOrdersScreen, ["refresh_onhold_sales", "show_onhold_sales", "prefetch_visible_carts", "load_sale"])
+	instrumentation.instrument(Window1, [
+		"start_sale_and_show_cart", "continue_sale", "handle_cash_payment",
+		"handle_iban_payment", "handle_cancel", "handle_suspend",
+	])
+	instrumentation.instrument(Window2, ["show_cart", "render_cart", "show_welcome"])
+
 if __name__ == "__main__":
+	if enable_from_env():
+		install_instrumentation()
+
+	if startup_trace.enabled:
+		startup_trace.instrument(DatabaseManager, [
+			"connect", "get_catalog", "get_campaigns", "get_cart", "onhold_orders_async",
+		])
+
 	app = QApplication(sys.argv)
+	startup_trace.mark("QApplication")
+	apply_theme(app)
+	startup_trace.mark("theme")
 	data = AppData()
-
-	second_window = Window2(data)
+	startup_trace.mark("database")
+
+	# POSTRINK_CUSTOMER_DISPLAY=process renders the customer display in its own process
+	if os.environ.get("POSTRINK_CUSTOMER_DISPLAY") == "process":
+		from customer_display import RemoteCustomerDisplay
+		second_window = RemoteCustomerDisplay(data)
+		app.aboutToQuit.connect(second_window.close)
+	else:
+		second_window = Window2(data)
 	main_window = Window1(data, second_window)
 
 	main_window.new_sale_button.clicked.connect(second_window.show_welcome)
+	startup_trace.mark("windows")
 
-	main_window.new_sale_screen.back_button.clicked.connect(second_window.show_welcome)
-	main_window.sales_screen.back_button.clicked.connect(second_window.show_welcome)
-	main_window.cart_screen.back_button.clicked.connect(second_window.show_welcome)
-	main_window.edit_stock_screen.back_button_clicked.connect(second_window.show_welcome)
+	# Commit whatever is still queued before the process exits
+	app.aboutToQuit.connect(data.database_manager.close)
+	if instrumentation.enabled:
+		app.aboutToQuit.connect(lambda: instrumentation.dump(os.environ.get("POSTRINK_INSTRUMENT_FILE", "instrumentation.json")))
 
+	# Reported from the first event loop turn, once the menu is on screen
+	QTimer.singleShot(0, startup_trace.report)
 	sys.exit(app.exec())
@@ -0,0 +1,242 @@
+# Versioned schema migrations for the POS database.
+#
+# The schema version is kept in PRAGMA user_version. Each entry of
+# MIGRATIONS upgrades the database by one version, so an existing
+# database.db is brought up to date in place and a new file is built
+# from scratch by the same steps.
+
+import sqlite3
+import sys
+
+MIGRATIONS = [
+    # 1: the original tables (already present in older database files)
+    [
+        """
+        CREATE TABLE IF NOT EXISTS items (
+            item_id INTEGER PRIMARY KEY,
+            item_name TEXT NOT NULL CHECK(LENGTH(item_name) <= 32),
+            item_price REAL NOT NULL CHECK(item_price >= 0),
+            item_stock INTEGER NOT NULL CHECK(item_stock >= 0)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS sales (
+            sale_id TEXT PRIMARY KEY NOT NULL CHECK(LENGTH(sale_id) <= 15),
+            sale_date TEXT NOT NULL,
+            customer_name TEXT NOT NULL CHECK(LENGTH(customer_name) <= 32),
+            total_discount_perc INTEGER NOT NULL CHECK(total_discount_perc >= 0 AND total_discount_perc <= 100),
+            total_discount_num REAL NOT NULL,
+            total_amount REAL NOT NULL,
+            payment_method TEXT NOT NULL,
+            payment_info TEXT
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS cart_items (
+            cart_item_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sale_id TEXT NOT NULL,
+            item_id INTEGER NOT NULL,
+            item_count INTEGER NOT NULL CHECK(item_count > 0),
+            item_discount_perc INTEGER NOT NULL CHECK(item_discount_perc >= 0 AND item_discount_perc <= 100),
+            item_discount_num REAL NOT NULL,
+            item_total REAL NOT NULL,
+
+            FOREIGN KEY (sale_id) REFERENCES sales(sale_id) ON DELETE CASCADE,
+            FOREIGN KEY (item_id) REFERENCES items(item_id) ON DELETE CASCADE
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS campaigns (
+            camp_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            item_id INTEGER NOT NULL,
+            min_quan INTEGER NOT NULL,
+            disc_type TEXT NOT NULL,   -- "fixed" or "percent"
+            disc_val REAL NOT NULL
+        );
+        """,
+    ],
+    # 2: indexes for the hot queries in data.py and satislar.py
+    [
+        # cart load, line updates/deletes and the report join on sale_id
+        "CREATE INDEX IF NOT EXISTS idx_cart_items_sale_item ON cart_items(sale_id, item_id);",
+        # on-hold list (payment_method = 'WIP'), newest first
+        "CREATE INDEX IF NOT EXISTS idx_sales_payment_date ON sales(payment_method, sale_date);",
+        # reports filtering on a sale_date range
+        "CREATE INDEX IF NOT EXISTS idx_sales_date ON sales(sale_date);",
+        # covering index for loading the campaign index in (item_id, min_quan) order
+        "CREATE INDEX IF NOT EXISTS idx_campaigns_item_quan ON campaigns(item_id, min_quan, disc_type, disc_val);",
+    ],
+    # 3: barcodes for scanner entry (NULL for items that have none)
+    [
+        "ALTER TABLE items ADD COLUMN barcode TEXT;",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_items_barcode ON items(barcode);",
+    ],
+    # 4: on-hold list served from a small partial index holding just the
+    # columns it shows; paid sales drop out of it. It supersedes
+    # idx_sales_payment_date, which only the on-hold list used.
+    # payment_method is repeated as a column so the index covers the query.
+    [
+        """
+        CREATE INDEX IF NOT EXISTS idx_sales_onhold
+        ON sales(sale_date, sale_id, customer_name, total_amount, payment_method)
+        WHERE payment_method = 'WIP';
+        """,
+        "DROP INDEX IF EXISTS idx_sales_payment_date;",
+    ],
+    # 5: per-day, per-payment-method totals of paid sales, so reports read
+    # one row per day and method instead of rescanning sales. Triggers keep
+    # it current on every insert, payment, total change and delete; WIP
+    # sales are left out until they are paid. day is the date part of
+    # sale_date, the same day the reports select a sale by.
+    [
+        """
+        CREATE TABLE IF NOT EXISTS daily_sales_summary (
+            day TEXT NOT NULL,
+            payment_method TEXT NOT NULL,
+            sale_count INTEGER NOT NULL,
+            total_amount REAL NOT NULL,
+            total_discount REAL NOT NULL,
+            PRIMARY KEY (day, payment_method)
+        ) WITHOUT ROWID;
+        """,
+        """
+        INSERT INTO daily_sales_summary (day, payment_method, sale_count, total_amount, total_discount)
+        SELECT substr(sale_date, 1, 10), payment_method, COUNT(*), SUM(total_amount), SUM(total_discount_num)
+        FROM sales
+        WHERE payment_method != 'WIP'
+        GROUP BY 1, 2;
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS sales_summary_insert
+        AFTER INSERT ON sales
+        WHEN NEW.payment_method != 'WIP'
+        BEGIN
+            INSERT INTO daily_sales_summary (day, payment_method, sale_count, total_amount, total_discount)
+            VALUES (substr(NEW.sale_date, 1, 10), NEW.payment_method, 1, NEW.total_amount, NEW.total_discount_num)
+            ON CONFLICT (day, payment_method) DO UPDATE SET
+                sale_count     = sale_count + 1,
+                total_amount   = total_amount + excluded.total_amount,
+                total_discount = total_discount + excluded.total_discount;
+        END;
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS sales_summary_update
+        AFTER UPDATE OF sale_date, payment_method, total_amount, total_discount_num ON sales
+        WHEN OLD.payment_method != 'WIP' OR NEW.payment_method != 'WIP'
+        BEGIN
+            UPDATE daily_sales_summary
+            SET sale_count     = sale_count - 1,
+                total_amount   = total_amount - OLD.total_amount,
+                total_discount = total_discount - OLD.total_discount_num
+            WHERE OLD.payment_method != 'WIP'
+              AND day = substr(OLD.sale_date, 1, 10) AND payment_method = OLD.payment_method;
+            DELETE FROM daily_sales_summary
+            WHERE day = substr(OLD.sale_date, 1, 10) AND payment_method = OLD.payment_method AND sale_count = 0;
+            INSERT INTO daily_sales_summary (day, payment_method, sale_count, total_amount, total_discount)
+            SELECT substr(NEW.sale_date, 1, 10), NEW.payment_method, 1, NEW.total_amount, NEW.total_discount_num
+            WHERE NEW.payment_method != 'WIP'
+            ON CONFLICT (day, payment_method) DO UPDATE SET
+                sale_count     = sale_count + 1,
+                total_amount   = total_amount + excluded.total_amount,
+                total_discount = total_discount + excluded.total_discount;
+        END;
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS sales_summary_delete
+        AFTER DELETE ON sales
+        WHEN OLD.payment_method != 'WIP'
+        BEGIN
+            UPDATE daily_sales_summary
+            SET sale_count     = sale_count - 1,
+                total_amount   = total_amount - OLD.total_amount,
+                total_discount = total_discount - OLD.total_discount_num
+            WHERE day = substr(OLD.sale_date, 1, 10) AND payment_method = OLD.payment_method;
+            DELETE FROM daily_sales_summary
+            WHERE day = substr(OLD.sale_date, 1, 10) AND payment_method = OLD.payment_method AND sale_count = 0;
+        END;
+        """,
+    ],
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+def hot_queries():
+    """
+    Returns {query name: (sql, sample params)} for the queries whose plans
+    are reported before and after migrating. The SQL is the one data.py
+    and satislar.py run; they are imported here because data.py imports
+    this module.
+    """
+    import data
+    import satislar
+    return {
+        "cart load": (data.SELECT_CART_LINES.format("?"), ("",)),
+        "cart line update": (data.UPDATE_CART_LINE, (1, 0, 0.0, 0.0, "", 0)),
+        "on-hold list": (data.SELECT_ONHOLD_ORDERS, ()),
+        "campaign index": (data.SELECT_CAMPAIGNS, ()),
+        "daily report": (satislar.REPORT_QUERY, ("", "")),
+        "report totals": (satislar.TOTALS_QUERY, ("", "")),
+    }
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate(conn):
+    """
+    Applies every migration newer than the database's user_version and
+    returns the list of versions applied. Each version runs in its own
+    SAVEPOINT, so a failing statement leaves the database at the previous
+    version instead of half applied. On a connection outside a transaction
+    (opened with isolation_level=None) every version is committed as it
+    completes; inside the caller's transaction the caller commits.
+    """
+    applied = []
+    version = schema_version(conn)
+    for number, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+        conn.execute("SAVEPOINT migration")
+        try:
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {number}")
+        except BaseException:
+            conn.execute("ROLLBACK TO migration")
+            conn.execute("RELEASE migration")
+            raise
+        conn.execute("RELEASE migration")
+        applied.append(number)
+    return applied
+
+def query_plans(conn):
+    """Returns {query name: [EXPLAIN QUERY PLAN detail lines]} for hot_queries()."""
+    plans = {}
+    for name, (sql, params) in hot_queries().items():
+        try:
+            rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+        except sqlite3.Error as e:
+            # e.g. a table that a pending migration creates
+            plans[name] = [f"n/a ({e})"]
+            continue
+        plans[name] = [row[3] for row in rows]
+    return plans
+
+def upgrade(db_name):
+    """Migrates db_name in place and prints the query plan of each hot query before and after."""
+    # Autocommit mode: migrate() commits each version as it completes
+    conn = sqlite3.connect(db_name, isolation_level=None)
+    try:
+        before = query_plans(conn)
+        applied = migrate(conn)
+        if not applied:
+            print(f"{db_name} is already at schema version {SCHEMA_VERSION}.")
+            return
+        print(f"{db_name}: applied migrations {applied}, now at schema version {SCHEMA_VERSION}.")
+        after = query_plans(conn)
+        for name in before:
+            print(f"\n{name}:")
+            print("  before: " + "; ".join(before[name]))
+            print("  after:  " + "; ".join(after[name]))
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    upgrade(sys.argv[1] if len(sys.argv) > 1 else "database.db")
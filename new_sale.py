@@ -3,11 +3,15 @@
 from PySide6.QtWidgets import (
 	QWidget, QVBoxLayout, QPushButton,
 	QLabel, QHBoxLayout, QLineEdit,
-	QMessageBox, QScrollArea, QGridLayout,
-	QSizePolicy
+	QMessageBox, QSizePolicy
 )
 from PySide6.QtCore import Qt, Signal, QDateTime, QTimer
+from PySide6.QtGui import QIntValidator
+from collections import deque
 from data import AppData
+from cart_model import CartModel, make_cart_view, make_total_row
+from product_grid import ProductModel, ProductGridView, make_filter_box
+from theme import set_role
 
 class NewSaleScreen(QWidget):
 	"""
@@ -22,60 +26,18 @@ class NewSaleScreen(QWidget):
 		layout = QVBoxLayout()
 		layout.setAlignment(Qt.AlignCenter)
 
-		title = QLabel("Müşteri Adı:")
-		title.setStyleSheet("""
-			font-size: 72px;
-			font-weight: bold;
-			color: white;
-		""")
+		title = set_role(QLabel("Müşteri Adı:"), "title")
 		title.setAlignment(Qt.AlignCenter)
 		
-		self.name_input = QLineEdit()
+		self.name_input = set_role(QLineEdit(), "name")
 		self.name_input.setPlaceholderText("örn: 946 Berk Eldemir")
-		self.name_input.setStyleSheet("""
-			QLineEdit {
-				font-size: 48px;
-				padding: 15px;
-				background-color: #34495e;
-				color: white;
-				border: 2px solid white;
-				border-radius: 10px;
-			}
-		""")
 		# Set the maximum length of the input to 32 characters
 		self.name_input.setMaxLength(32)
 		self.name_input.setFixedSize(750, 80)
 		
-		self.next_button = QPushButton("Devam")
-		self.next_button.setStyleSheet("""
-			QPushButton {
-				background-color: #55cc55;
-				color: white;
-				font-size: 48px;
-				font-weight: bold;
-				padding: 20px;
-				margin-top: 5px;
-				border-radius: 10px;
-				height: 60px;
-				border: 2px solid white;
-			}
-		""")
-		self.back_button = QPushButton("Geri")
-		self.back_button.setStyleSheet("""
-			QPushButton {
-				background-color: #2c3e50;
-				color: white;
-				font-size: 48px;
-				font-weight: bold;
-				padding: 20px;
-				border-radius: 10px;
-				height: 60px;
-				border: 2px solid white;
-			}
-			QPushButton:hover {
-				background-color: #34495e;
-			}
-		""")
+		self.next_button = set_role(QPushButton("Devam"), "form")
+		self.next_button.setObjectName("startSaleButton")
+		self.back_button = set_role(QPushButton("Geri"), "form")
 
 		layout.addWidget(title)
 		layout.addWidget(self.name_input)
@@ -97,12 +59,18 @@ class NewSaleScreen(QWidget):
 		self.name_input.blockSignals(False)
 		self.name_input.setCursorPosition(cursor_pos)
 
+# Scanned codes are applied together at most this often, so a burst of
+# scans costs one cart refresh instead of one per code
+SCAN_BATCH_MS = 30
+
 class CartScreen(QWidget):
 	"""
 	The main sales screen for the cashier where items will be added and viewed.
+	Items are added by tapping a product tile or by scanning a barcode or
+	keying a PLU into the code box.
 	"""
 	back_to_menu = Signal()
-	item_added = Signal()  # New signal to notify that an item has been added
+	item_added = Signal(object)  # Emits the CartSnapshot after an item has been added
 
 	def __init__(self, parent=None):
 		super().__init__(parent)
@@ -117,14 +85,8 @@ class CartScreen(QWidget):
 		self.customer_label = QLabel("Müşteri: -")
 		self.date_time_label = QLabel("-")
 		
-		label_style = """
-			font-size: 28px;
-			color: white;
-			padding: 10px;
-			font-weight: bold;
-		"""
-		self.customer_label.setStyleSheet(label_style)
-		self.date_time_label.setStyleSheet(label_style)
+		set_role(self.customer_label, "info")
+		set_role(self.date_time_label, "info")
 
 		info_layout.addWidget(self.customer_label, 1, Qt.AlignLeft)
 		info_layout.addStretch(1)
@@ -138,116 +100,59 @@ class CartScreen(QWidget):
 		# Bottom half: Products and cart area
 		content_layout = QHBoxLayout()
 		
-		# Left 1/3 of the bottom half for product buttons
+		# Left 1/3 of the bottom half for the product grid and its filter box
 		products_layout_container = QVBoxLayout()
-		self.products_container = QWidget()
-		self.products_grid_layout = QGridLayout(self.products_container)
-		
-		self.products_scroll_area = QScrollArea()
-		self.products_scroll_area.setWidgetResizable(True)
-		self.products_scroll_area.setWidget(self.products_container)
-		self.products_scroll_area.setStyleSheet("""
-			QScrollArea {
-				border: 2px solid #111;
-				border-radius: 10px;
-				text-align: left;
-				background-color: #333;
-			}
-		""")
-		products_layout_container.addWidget(self.products_scroll_area)
-
-		# Middle section: Cart items
+		self.catalog_version = None  # catalog version the product grid was built from
+		self.app_data = None
+
+		# A USB scanner types the code followed by Enter into the focused code box
+		self.code_input = make_filter_box("Barkod / PLU")
+		self.code_input.returnPressed.connect(self.handle_code_entered)
+		self.scan_queue = deque()
+		self.scan_timer = QTimer(self)
+		self.scan_timer.setSingleShot(True)
+		self.scan_timer.setInterval(SCAN_BATCH_MS)
+		self.scan_timer.timeout.connect(self.apply_scans)
+
+		# Quantity multiplier: "24" then a tap or scan adds 24 of that item, then resets to 1
+		self.quantity_input = make_filter_box("Adet")
+		self.quantity_input.setValidator(QIntValidator(1, 999, self))
+		self.quantity_input.setFixedWidth(140)
+		self.quantity_input.returnPressed.connect(self.code_input.setFocus)
+		code_row = QHBoxLayout()
+		code_row.addWidget(self.quantity_input)
+		code_row.addWidget(self.code_input, 1)
+
+		self.product_filter = make_filter_box()
+		self.product_model = ProductModel(self)
+		self.product_view = ProductGridView(self.product_model)
+		self.product_filter.textChanged.connect(self.product_model.set_filter)
+		self.product_filter.returnPressed.connect(self.code_input.setFocus)
+		self.product_view.product_clicked.connect(lambda item_id: self.handle_product_click(item_id, self.app_data))
+		products_layout_container.addLayout(code_row)
+		products_layout_container.addWidget(self.product_filter)
+		products_layout_container.addWidget(self.product_view, 1)
+
+		# Middle section: Cart items, shown through a model so a tap only updates the rows it changed
 		cart_layout_container = QVBoxLayout()
 		
-		self.cart_items_layout = QVBoxLayout()
-		self.cart_items_layout.setAlignment(Qt.AlignTop)
-		
-		self.cart_scroll_area = QScrollArea()
-		self.cart_scroll_area.setWidgetResizable(True)
-		cart_items_widget = QWidget()
-		cart_items_widget.setLayout(self.cart_items_layout)
-		self.cart_scroll_area.setWidget(cart_items_widget)
-		self.cart_scroll_area.setStyleSheet("""
-			QScrollArea {
-				border: 2px solid #111;
-				border-radius: 10px;
-				background-color: #333;
-			}
-		""")
-		cart_layout_container.addWidget(self.cart_scroll_area)
+		self.cart_model = CartModel(28, self)
+		self.cart_view = make_cart_view(self.cart_model, 28, 56)
+		cart_layout_container.addWidget(self.cart_view, 1)
+
+		self.disc_row, self.disc_value = make_total_row("İNDİRİM:", 28)
+		self.total_row, self.total_value = make_total_row("TOTAL:", 28)
+		cart_layout_container.addWidget(self.disc_row)
+		cart_layout_container.addWidget(self.total_row)
 		
 		# Right 2/3 of the bottom half for the cart (placeholder)
 		buttons_layout = QVBoxLayout()
 		
-		self.back_button = QPushButton("Askıya Al")
-		self.back_button.setStyleSheet("""
-			QPushButton {
-				background-color: #2c3e50;
-				color: white;
-				font-size: 48px;
-				font-weight: bold;
-				padding: 20px;
-				border-radius: 10px;
-				width: 450px;
-				height: 80px;
-				border: 2px solid white;
-			}
-			QPushButton:hover {
-				background-color: #34495e;
-			}
-		""")
-
-		self.cancel_button = QPushButton("İptal")
-		self.cancel_button.setStyleSheet("""
-			QPushButton {
-				background-color: #2c3e50;
-				color: white;
-				font-size: 48px;
-				font-weight: bold;
-				padding: 20px;
-				border-radius: 10px;
-				width: 450px;
-				height: 80px;
-				border: 2px solid white;
-			}
-			QPushButton:hover {
-				background-color: #34495e;
-			}
-		""")
-		self.cash_button = QPushButton("Nakit")
-		self.cash_button.setStyleSheet("""
-			QPushButton {
-				background-color: #2c3e50;
-				color: white;
-				font-size: 48px;
-				font-weight: bold;
-				padding: 20px;
-				border-radius: 10px;
-				width: 450px;
-				height: 80px;
-				border: 2px solid white;
-			}
-			QPushButton:hover {
-				background-color: #34495e;
-			}
-		""")
-		self.iban_button = QPushButton("IBAN")
-		self.iban_button.setStyleSheet("""
-			QPushButton {
-				background-color: #2c3e50;
-				color: white;
-				font-size: 48px;
-				font-weight: bold;
-				padding: 20px;
-				border-radius: 10px;
-				width: 450px;
-				height: 80px;
-				border: 2px solid white;
-			}
-			QPushButton:hover {
-				background-color: #34495e;
-			}
-		""")
+		self.back_button = set_role(QPushButton("Askıya Al"), "action")
+
+		self.cancel_button = set_role(QPushButton("İptal"), "action")
+		self.cash_button = set_role(QPushButton("Nakit"), "action")
+		self.iban_button = set_role(QPushButton("IBAN"), "action")
 		self.back_button.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
 		buttons_layout.addWidget(self.back_button, alignment=Qt.AlignCenter)
 		self.cancel_button.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
@@ -285,183 +190,80 @@ class CartScreen(QWidget):
 		self.update_date_time()
 		self.load_products(app_data)
 		self.refresh_cart_items(app_data)
+		self.code_input.setFocus()
 
-	def wrap_text(self, text, max_chars=15):
-		words = text.split(' ')
-		lines = []
-		current_line = ''
-		for word in words:
-			if len(current_line + ' ' + word) > max_chars:
-				lines.append(current_line)
-				current_line = word
-			else:
-				if current_line:
-					current_line += ' ' + word
-				else:
-					current_line = word
-		lines.append(current_line)
-		return '\n'.join(lines)
-		
 	def load_products(self, app_data: AppData):
 		"""
-		Fetches products from the database and creates buttons for each one.
+		Points the product grid at the catalog cache. Nothing is rebuilt when
+		the catalog has not changed since the grid was last loaded.
 		"""
-		# Clear existing buttons
-		for i in reversed(range(self.products_grid_layout.count())):
-			widget_to_remove = self.products_grid_layout.itemAt(i).widget()
-			if widget_to_remove is not None:
-				widget_to_remove.setParent(None)
-
-		products = app_data.database_manager.get_all_products()
-		
-		row = 0
-		col = 0
-		for product in products:
-			# Convert the sqlite3.Row object to a dictionary to use .get()
-			product_dict = dict(product)
-			item_name = product_dict.get('item_name', 'Bilinmeyen Ürün')
-			
-			item_button = QPushButton("")
-			wrapped_name = self.wrap_text(item_name, 15)
-			item_button.setText(wrapped_name)
-
-				
-			item_button.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
-			#item_button.setWordWrap(True)
-			item_button.setStyleSheet("""
-				QPushButton {
-					background-color: #2c3e50;
-					color: white;
-					font-size: 32px;
-					font-weight: bold;
-					border: 2px solid #555;
-					border-radius: 10px;
-				}
-				QPushButton:hover {
-					background-color: #34495e;
-				}
-			""")
-			
-			item_button.clicked.connect(lambda _, id=product['item_id'], ad=app_data: self.handle_product_click(id, ad))
-			self.products_grid_layout.addWidget(item_button, row, col)
-			col += 1
-			if col > 1: # 2 columns
-				col = 0
-				row += 1
+		self.app_data = app_data
+		catalog = app_data.database_manager.get_catalog()
+		if catalog.version == self.catalog_version:
+			return
+		self.catalog_version = catalog.version
+		self.product_model.set_catalog(catalog, self.product_filter.text())
+
+	def take_quantity(self):
+		"""Returns the quantity multiplier (1 if empty or not 1-999) and clears it for the next item."""
+		# The validator still lets intermediate text such as "0" into the box
+		count = int(self.quantity_input.text()) if self.quantity_input.hasAcceptableInput() else 1
+		self.quantity_input.clear()
+		return count
 
 	def handle_product_click(self, item_id, app_data:AppData):
+		self.add_to_cart(app_data, [(item_id, self.take_quantity())])
+
+	def add_to_cart(self, app_data: AppData, items):
+		"""Adds a batch of (item_id, count) pairs, then refreshes both displays once."""
 		# Call the database method and check if successful
-		if app_data.database_manager.add_item_to_cart(app_data.curr_sale_id, item_id, 1, 0, 0):
+		if app_data.database_manager.add_items_to_cart(app_data.curr_sale_id, items):
 			# If successful, refresh the cart on this screen
-			self.refresh_cart_items(app_data)
-			# Emit a signal to tell other parts of the app to also refresh
-			self.item_added.emit()
-			
-	def refresh_cart_items(self, app_data: AppData):
+			snapshot = app_data.database_manager.cart_snapshot(app_data.curr_sale_id)
+			self.refresh_cart_items(app_data, snapshot)
+			# Emit a signal to tell other parts of the app to render the same snapshot
+			self.item_added.emit(snapshot)
+		# The next scan goes to the code box, whichever box was used for this item
+		self.code_input.setFocus()
+
+	def handle_code_entered(self):
+		"""Queues the code in the code box; the queue is applied on the next scan_timer tick."""
+		code = self.code_input.text().strip()
+		self.code_input.clear()
+		if not code:
+			return
+		self.scan_queue.append((code, self.take_quantity()))
+		if not self.scan_timer.isActive():
+			self.scan_timer.start()
+
+	def apply_scans(self):
+		"""Adds every queued code to the cart as one batch."""
+		app_data = self.app_data
+		if app_data is None or app_data.curr_sale_id is None:
+			self.scan_queue.clear()
+			return
+		manager = app_data.database_manager
+		items = []
+		while self.scan_queue:
+			code, count = self.scan_queue.popleft()
+			item_row = manager.get_item_by_code(code)
+			if item_row is None:
+				print(f"ERROR   : Unknown barcode / PLU: {code}")
+				continue
+			items.append((item_row["item_id"], count))
+		if items:
+			self.add_to_cart(app_data, items)
+
+	def refresh_cart_items(self, app_data: AppData, snapshot=None):
 		"""
-		Clears and reloads cart items from the database to display on this screen.
+		Shows a CartSnapshot (the current one if not given): only the changed
+		rows are updated and the totals rows are updated in place.
 		"""
-		# 1. Clear old widgets
-		while self.cart_items_layout.count():
-			child = self.cart_items_layout.takeAt(0)
-			if child.widget():
-				child.widget().deleteLater()
-
-		# 2. Fetch latest items
-		cart_items = app_data.database_manager.get_cart_items(app_data.curr_sale_id)
-
-		# 3. Populate layout with new items
-		for i, item in enumerate(cart_items):
-			item_row_widget = QWidget()
-			item_row_widget.setStyleSheet("""
-				QWidget {
-					background-color: #2c3e50;
-					margin: 0px 0px 0px 0px;
-					color: white;
-					border: .3px solid white;
-					border-radius: 5px;
-					margin-bottom: 5px;
-				}
-			""")
-			
-			item_row_layout = QHBoxLayout(item_row_widget)
-			item_row_layout.setContentsMargins(5, 5, 5, 5)
-
-			item_number_lbl = QLabel(f"{item['item_count']}")
-			item_number_lbl.setStyleSheet("font-size: 28px; font-weight: bold; min-width: 42px;")
-			item_number_lbl.setAlignment(Qt.AlignLeft)
-
-			item_name_lbl = QLabel(f"{item['item_name']}")
-			item_name_lbl.setStyleSheet("font-size: 28px;")
-			item_name_lbl.setAlignment(Qt.AlignLeft)
-
-			item_price_lbl = QLabel(f"{item['item_total'] + item['item_discount_num']} TL")
-			item_price_lbl.setStyleSheet("font-size: 28px; font-weight: bold; min-width: 64px;")
-			item_price_lbl.setAlignment(Qt.AlignRight)
-
-			item_row_layout.addWidget(item_number_lbl)
-			item_row_layout.addSpacing(10)
-			item_row_layout.addWidget(item_name_lbl, 1) # Set stretch to expand
-			item_row_layout.addWidget(item_price_lbl)
-			
-			self.cart_items_layout.addWidget(item_row_widget)
-
-		item_row_widget = QWidget()
-		item_row_widget.setStyleSheet("""
-			QWidget {
-				background-color: #2c3e50;
-				margin: 0px 0px 0px 0px;
-				color: white;
-				border: .3px solid white;
-				border-radius: 5px;
-				margin-bottom: 5px;
-			}
-		""")
-
-		# --- disc row ---
-		disc_row = QWidget()
-		disc_row.setStyleSheet("""
-			QWidget {
-				background-color: #3e502c;
-				margin: 0px 0px 0px 0px;
-				color: white;
-				border: .3px solid white;
-				border-radius: 5px;
-				margin-bottom: 5px;
-			}
-		""")
-		disc_layout = QHBoxLayout(disc_row)
-		disc_layout.setContentsMargins(5, 5, 5, 5)
-
-		disc_layout.addWidget(QLabel(""), 0)
-		disc_label = QLabel("İNDİRİM:")
-		disc_label.setStyleSheet("font-size: 28px;")
-		disc_layout.addWidget(disc_label, 1)
-
-		discount = app_data.database_manager.total_discount_num(app_data.curr_sale_id)
-		disc_price = QLabel(f"{discount} TL")
-		disc_price.setStyleSheet("font-size: 28px; font-weight: bold; min-width: 64px;")
-		disc_layout.addWidget(disc_price)
-
-		self.cart_items_layout.addWidget(disc_row)
-
-		# --- TOTAL row ---
-		total_row = QWidget()
-		total_row.setStyleSheet(disc_row.styleSheet())
-		total_layout = QHBoxLayout(total_row)
-		total_layout.setContentsMargins(5, 5, 5, 5)
-
-		total_layout.addWidget(QLabel(""), 0)
-		total_label = QLabel("TOTAL:")
-		total_label.setStyleSheet("font-size: 28px;")
-		total_layout.addWidget(total_label, 1)
-
-		total_amount = app_data.database_manager.total_amount_calculator(app_data.curr_sale_id)
-		total_price = QLabel(f"{total_amount} TL")
-		total_price.setStyleSheet("font-size: 28px; font-weight: bold; min-width: 64px;")
-		total_layout.addWidget(total_price)
-
-		self.cart_items_layout.addWidget(total_row)
+		if snapshot is None:
+			snapshot = app_data.database_manager.cart_snapshot(app_data.curr_sale_id)
+		self.cart_model.set_snapshot(snapshot)
+		self.disc_value.setText(f"{snapshot.discount_total} TL")
+		self.total_value.setText(f"{snapshot.total} TL")
 
 class CustomerCartScreen(QWidget):
 	"""
@@ -481,14 +283,8 @@ class CustomerCartScreen(QWidget):
 		self.customer_label = QLabel("TR48 0001 0026 6374 3879 0650 01")
 		self.date_time_label = QLabel("-")
 
-		label_style = """
-			font-size: 28px;
-			color: white;
-			padding: 10px;
-			font-weight: bold;
-		"""
-		self.customer_label.setStyleSheet(label_style)
-		self.date_time_label.setStyleSheet(label_style)
+		set_role(self.customer_label, "info")
+		set_role(self.date_time_label, "info")
 
 		info_layout.addWidget(self.customer_label, 1, Qt.AlignLeft)
 		info_layout.addStretch(1)
@@ -497,23 +293,12 @@ class CustomerCartScreen(QWidget):
 		layout.addLayout(info_layout)
 
 		# --- Cart items area ---
-		self.cart_layout = QVBoxLayout()
-		self.cart_layout.setAlignment(Qt.AlignTop)
-
-		self.cart_scroll_area = QScrollArea()
-		self.cart_scroll_area.setWidgetResizable(True)
-		cart_items_widget = QWidget()
-		cart_items_widget.setLayout(self.cart_layout)
-		self.cart_scroll_area.setWidget(cart_items_widget)
-		self.cart_scroll_area.setStyleSheet("""
-			QScrollArea {
-				border: 2px solid #111;
-				border-radius: 10px;
-				background-color: #333;
-			}
-		""")
-
-		layout.addWidget(self.cart_scroll_area)
+		self.cart_model = CartModel(48, self)
+		self.cart_view = make_cart_view(self.cart_model, 48, 80)
+		layout.addWidget(self.cart_view, 1)
+
+		self.total_row, self.total_value = make_total_row("TOTAL:", 48)
+		layout.addWidget(self.total_row)
 
 		self.setLayout(layout)
 
@@ -531,80 +316,16 @@ class CustomerCartScreen(QWidget):
 		formatted_datetime = current_datetime.toString("dd.MM.yyyy hh:mm:ss")
 		self.date_time_label.setText(formatted_datetime)
 
-	def refresh_data(self, app_data: AppData):
+	def refresh_data(self, app_data: AppData, snapshot=None):
 		"""Refresh both labels and cart items."""
 		self.customer_label.setText(f"Hoş geldiniz, {app_data.curr_customer_name}")
 		self.update_date_time()
-		self.refresh_cart_items(app_data)
-
-	def refresh_cart_items(self, app_data: AppData):
-		"""Clear and reload cart items from the database."""
-		# 1. Clear old widgets
-		while self.cart_layout.count():
-			child = self.cart_layout.takeAt(0)
-			if child.widget():
-				child.widget().deleteLater()
-
-		# 2. Fetch latest items
-		cart_items = app_data.database_manager.get_cart_items(app_data.curr_sale_id)
-
-		# 3. Populate layout with new items in a rectangular format
-		for i, item in enumerate(cart_items):
-			item_row_widget = QWidget()
-			item_row_widget.setStyleSheet("""
-				QWidget {
-					background-color: #2c3e50;
-					color: white;
-					border: .3px solid white;
-					border-radius: 5px;
-					margin-bottom: 5px;
-				}
-			""")
-			
-			item_row_layout = QHBoxLayout(item_row_widget)
-			item_row_layout.setContentsMargins(10, 5, 10, 5)
-
-			item_number_lbl = QLabel(f"{item['item_count']}")
-			item_number_lbl.setStyleSheet("font-size: 48px; font-weight: bold; min-width: 56px;")
-
-			item_name_lbl = QLabel(f"{item['item_name']}")
-			item_name_lbl.setStyleSheet("font-size: 48px;")
-
-			item_price_lbl = QLabel(f"{item['item_total'] + item['item_discount_num']} TL")
-			item_price_lbl.setStyleSheet("font-size: 48px; font-weight: bold; min-width: 96px;")
-			item_price_lbl.setAlignment(Qt.AlignRight)
-
-			item_row_layout.addWidget(item_number_lbl)
-			item_row_layout.addSpacing(10)
-			item_row_layout.addWidget(item_name_lbl, 1)
-			item_row_layout.addWidget(item_price_lbl)
-			
-			self.cart_layout.addWidget(item_row_widget)
-
-		# --- Total row ---
-		total_row = QWidget()
-		total_row.setStyleSheet("""
-			QWidget {
-				background-color: #3e502c;
-				color: white;
-				border: .3px solid white;
-				border-radius: 5px;
-				margin-bottom: 5px;
-			}
-		""")
-		total_layout = QHBoxLayout(total_row)
-		total_layout.setContentsMargins(10, 5, 10, 5)
-
-		total_label = QLabel("TOTAL:")
-		total_label.setStyleSheet("font-size: 48px;")
-		total_layout.addWidget(total_label, 1)
-
-		total_amount = app_data.database_manager.total_amount_calculator(app_data.curr_sale_id)
-		total_price = QLabel(f"{total_amount} TL")
-		total_price.setStyleSheet("font-size: 48px; font-weight: bold; min-width: 96px;")
-		total_price.setAlignment(Qt.AlignRight)
-		total_layout.addWidget(total_price)
-
-		self.cart_layout.addWidget(total_row)
-		scroll_bar = self.cart_scroll_area.verticalScrollBar()
-		scroll_bar.setValue(scroll_bar.maximum() + 50)
+		self.refresh_cart_items(app_data, snapshot)
+
+	def refresh_cart_items(self, app_data: AppData, snapshot=None):
+		"""Show a CartSnapshot (the current one if not given), updating only the changed rows."""
+		if snapshot is None:
+			snapshot = app_data.database_manager.cart_snapshot(app_data.curr_sale_id)
+		self.cart_model.set_snapshot(snapshot)
+		self.total_value.setText(f"{snapshot.total} TL")
+		self.cart_view.scrollToBottom()
@@ -1,13 +1,89 @@
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QPushButton,
-    QLabel, QScrollArea, QFrame, QSpacerItem, QSizePolicy
+    QLabel, QListView, QAbstractItemView, QSpacerItem, QSizePolicy
 )
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import Qt, Signal, QAbstractListModel, QModelIndex, QSize, QTimer, QPoint
+from PySide6.QtGui import QFont, QColor
 from data import AppData
+from qt_async import on_result
+from theme import set_role
+
+# Quiet time after a scroll or list change before the carts of the
+# visible sales are prefetched
+PREFETCH_DELAY_MS = 100
+
+SaleIdRole = Qt.UserRole + 1
+CustomerNameRole = Qt.UserRole + 2
+
+class OnHoldModel(QAbstractListModel):
+    """
+    On-hold sales as [sale_id, customer_name, total_amount], newest first.
+    After the first load, suspending, paying or cancelling a sale inserts,
+    updates or removes just its row instead of re-querying the list.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+        self.font = QFont()
+        self.font.setPixelSize(24)
+        self.font.setBold(True)
+        self.foreground = QColor("white")
+        self.size = QSize(500, 120)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        sale_id, customer_name, total_amount = self.rows[index.row()]
+        if role == Qt.DisplayRole:
+            return f"{sale_id}\n{customer_name}\n{total_amount:.2f} ₺"
+        if role == SaleIdRole:
+            return sale_id
+        if role == CustomerNameRole:
+            return customer_name
+        if role == Qt.FontRole:
+            return self.font
+        if role == Qt.ForegroundRole:
+            return self.foreground
+        if role == Qt.SizeHintRole:
+            return self.size
+        if role == Qt.TextAlignmentRole:
+            return int(Qt.AlignLeft | Qt.AlignVCenter)
+        return None
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self.rows = [[row["sale_id"], row["customer_name"], row["total_amount"]] for row in rows]
+        self.endResetModel()
+
+    def find(self, sale_id):
+        for position, row in enumerate(self.rows):
+            if row[0] == sale_id:
+                return position
+        return -1
+
+    def upsert(self, sale_id, customer_name, total_amount):
+        position = self.find(sale_id)
+        if position >= 0:
+            self.rows[position][1:] = [customer_name, total_amount]
+            self.dataChanged.emit(self.index(position), self.index(position))
+            return
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self.rows.insert(0, [sale_id, customer_name, total_amount])
+        self.endInsertRows()
+
+    def remove(self, sale_id):
+        position = self.find(sale_id)
+        if position >= 0:
+            self.beginRemoveRows(QModelIndex(), position, position)
+            del self.rows[position]
+            self.endRemoveRows()
 
 class OnHoldOrdersScreen(QWidget):
     back_to_menu = Signal()
-    continue_sale = Signal(str)
+    continue_sale = Signal(str, str)  # sale_id, customer_name
 
     def __init__(self, app_data, parent=None):
         super().__init__(parent)
@@ -23,46 +99,35 @@ class OnHoldOrdersScreen(QWidget):
         main_layout.addItem(top_spacer)
 
         # Title
-        title = QLabel("Askıdaki İşlemler:")
-        title.setStyleSheet("""
-            font-size: 72px;
-            font-weight: bold;
-            color: white;
-        """)
+        title = set_role(QLabel("Askıdaki İşlemler:"), "title")
         title.setAlignment(Qt.AlignCenter)
         main_layout.addWidget(title)
 
-        # Scroll area for sales buttons
-        self.scroll_area = QScrollArea()
-        self.scroll_area.setWidgetResizable(True)
-        self.scroll_area.setStyleSheet("border: none;")
-        main_layout.addWidget(self.scroll_area)
-
-        # Container for sales buttons
-        self.sales_buttons_container = QVBoxLayout()
-        self.sales_buttons_container.setAlignment(Qt.AlignTop)
-        container_widget = QWidget()
-        container_widget.setLayout(self.sales_buttons_container)
-        self.scroll_area.setWidget(container_widget)
+        # Virtualized list of the on-hold sales
+        self.model = OnHoldModel(self)
+        self.list_view = QListView()
+        self.list_view.setObjectName("onholdList")
+        self.list_view.setModel(self.model)
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setSpacing(4)
+        self.list_view.setSelectionMode(QAbstractItemView.NoSelection)
+        self.list_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.list_view.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.list_view.clicked.connect(
+            lambda index: self.load_sale(index.data(SaleIdRole), index.data(CustomerNameRole)))
+        main_layout.addWidget(self.list_view)
+
+        # Warm the cart cache for the sales on screen, so resuming one needs no database read
+        self.prefetch_timer = QTimer(self)
+        self.prefetch_timer.setSingleShot(True)
+        self.prefetch_timer.setInterval(PREFETCH_DELAY_MS)
+        self.prefetch_timer.timeout.connect(self.prefetch_visible_carts)
+        self.list_view.verticalScrollBar().valueChanged.connect(self.prefetch_timer.start)
+        self.model.modelReset.connect(self.prefetch_timer.start)
+        self.model.rowsInserted.connect(self.prefetch_timer.start)
 
         # Back button
-        back_button = QPushButton("Geri")
-        back_button.setStyleSheet("""
-            QPushButton {
-                background-color: #2c3e50;
-                color: white;
-                font-size: 48px;
-                font-weight: bold;
-                padding: 20px;
-                border-radius: 10px;
-                width: 450px;
-                height: 80px;
-                border: 2px solid white;
-            }
-            QPushButton:hover {
-                background-color: #34495e;
-            }
-        """)
+        back_button = set_role(QPushButton("Geri"), "action")
         back_button.clicked.connect(self.back_to_menu.emit)
         main_layout.addWidget(back_button)
         self.back_button = back_button
@@ -71,57 +136,47 @@ class OnHoldOrdersScreen(QWidget):
         bottom_spacer = QSpacerItem(20, 100, QSizePolicy.Minimum, QSizePolicy.Expanding)
         main_layout.addItem(bottom_spacer)
 
-        # Initial load
-        self.refresh_onhold_sales()
-
     def refresh_onhold_sales(self):
-        # Clear previous buttons
-        for i in reversed(range(self.sales_buttons_container.count())):
-            widget = self.sales_buttons_container.itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
-
-        # Fetch current on-hold sales
-        onhold_sales = self.app_data.database_manager.get_onhold_sales()
-
-        for row in onhold_sales:
-            sale_id = row["sale_id"]
-            customer_name = row["customer_name"]
-            total_amount = row["total_amount"]
-
-            # Create button
-            btn = QPushButton(f"{sale_id}\n{customer_name}\n{total_amount:.2f} ₺")
-            btn.setStyleSheet("""
-                QPushButton {
-                    background-color: #34495e;
-                    color: white;
-                    font-size: 24px;
-                    font-weight: bold;
-                    padding: 20px;
-                    border-radius: 10px;
-                    border: 2px solid white;
-                    text-align: left;
-                }
-                QPushButton:hover {
-                    background-color: #2c3e50;
-                }
-            """)
-            btn.setFixedSize(500, 120)
-            btn.clicked.connect(lambda checked, s=sale_id: self.load_sale(s))
-            self.sales_buttons_container.addWidget(btn)
-
-    def load_sale(self, sale_id):
+        # Fetch current on-hold sales on the database worker
+        future = self.app_data.database_manager.onhold_orders_async()
+        on_result(future, self.show_onhold_sales)
+
+    def show_onhold_sales(self, onhold_sales):
+        self.model.set_rows(onhold_sales)
+
+    def sale_suspended(self, sale_id, customer_name, total_amount):
+        self.model.upsert(sale_id, customer_name, total_amount)
+
+    def sale_closed(self, sale_id):
+        """The sale was paid or cancelled, so it is no longer on hold."""
+        self.model.remove(sale_id)
+
+    def visible_sale_ids(self):
+        viewport = self.list_view.viewport()
+        first = self.list_view.indexAt(QPoint(0, 0)).row()
+        last = self.list_view.indexAt(QPoint(0, viewport.height() - 1)).row()
+        if first < 0:
+            first = 0
+        if last < 0:
+            last = self.model.rowCount() - 1
+        return [row[0] for row in self.model.rows[first:last + 1]]
+
+    def prefetch_visible_carts(self):
+        database_manager = self.app_data.database_manager
+        future = database_manager.prefetch_carts_async(self.visible_sale_ids())
+        if future is not None:
+            on_result(future, database_manager.install_prefetched)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.prefetch_timer.start()
+
+    def load_sale(self, sale_id, customer_name):
         # Update app_data to point to this sale
         self.app_data.curr_sale_id = sale_id
-
-        # Fetch customer name
-        cur = self.app_data.database_manager.conn.cursor()
-        cur.execute("SELECT customer_name FROM sales WHERE sale_id = ?", (sale_id,))
-        row = cur.fetchone()
-        if row:
-            self.app_data.curr_customer_name = row["customer_name"]
+        self.app_data.curr_customer_name = customer_name
 
         print(f"OLD SALE: {sale_id} for {self.app_data.curr_customer_name}")
 
         # Emit signal to continue sale
-        self.continue_sale.emit(sale_id)
+        self.continue_sale.emit(sale_id, customer_name)
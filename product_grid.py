@@ -0,0 +1,119 @@
+from functools import lru_cache
+
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex, QSize, Signal
+from PySide6.QtGui import QFont, QColor
+from PySide6.QtWidgets import QListView, QAbstractItemView, QLineEdit, QStyledItemDelegate, QStyle
+
+from theme import set_role
+
+ItemIdRole = Qt.UserRole + 1
+
+@lru_cache(maxsize=None)
+def wrap_text(text, max_chars=15):
+	words = text.split(' ')
+	lines = []
+	current_line = ''
+	for word in words:
+		if len(current_line + ' ' + word) > max_chars:
+			lines.append(current_line)
+			current_line = word
+		else:
+			if current_line:
+				current_line += ' ' + word
+			else:
+				current_line = word
+	lines.append(current_line)
+	return '\n'.join(lines)
+
+class ProductModel(QAbstractListModel):
+	"""
+	List model over the catalog cache's items, optionally filtered.
+	Labels are wrapped lazily, when a tile is first painted, and cached.
+	"""
+	def __init__(self, parent=None):
+		super().__init__(parent)
+		self.catalog = None
+		self.rows = []  # positions in catalog.items currently shown
+		self.font = QFont()
+		self.font.setPixelSize(32)
+		self.font.setBold(True)
+		self.foreground = QColor("white")
+
+	def set_catalog(self, catalog, text=""):
+		self.beginResetModel()
+		self.catalog = catalog
+		self.rows = catalog.search(text)
+		self.endResetModel()
+
+	def set_filter(self, text):
+		if self.catalog is not None:
+			self.set_catalog(self.catalog, text)
+
+	def rowCount(self, parent=QModelIndex()):
+		return 0 if parent.isValid() else len(self.rows)
+
+	def data(self, index, role=Qt.DisplayRole):
+		if not index.isValid():
+			return None
+		product = self.catalog.items[self.rows[index.row()]]
+		if role == Qt.DisplayRole:
+			return wrap_text(product["item_name"] or "Bilinmeyen Ürün", 15)
+		if role == ItemIdRole:
+			return product["item_id"]
+		if role == Qt.FontRole:
+			return self.font
+		if role == Qt.ForegroundRole:
+			return self.foreground
+		if role == Qt.TextAlignmentRole:
+			return int(Qt.AlignCenter)
+		return None
+
+class TileDelegate(QStyledItemDelegate):
+	"""Sizes every tile to fill its grid cell."""
+	def sizeHint(self, option, index):
+		grid = self.parent().gridSize()
+		return QSize(grid.width() - 8, grid.height() - 8)
+
+class ProductGridView(QListView):
+	"""
+	Two-column grid of product tiles. QListView only paints the tiles in
+	the viewport, so thousands of SKUs cost no live widgets.
+	"""
+	product_clicked = Signal(int)
+
+	COLUMNS = 2
+	TILE_HEIGHT = 160
+
+	def __init__(self, model, parent=None):
+		super().__init__(parent)
+		self.setObjectName("productGrid")
+		self.setModel(model)
+		self.setItemDelegate(TileDelegate(self))
+		self.setViewMode(QListView.IconMode)
+		self.setFlow(QListView.LeftToRight)
+		self.setWrapping(True)
+		self.setResizeMode(QListView.Adjust)
+		self.setMovement(QListView.Static)
+		self.setUniformItemSizes(True)
+		self.setLayoutMode(QListView.Batched)
+		self.setBatchSize(200)
+		self.setSelectionMode(QAbstractItemView.NoSelection)
+		self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+		self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+		self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+		# Tapping a tile must leave keyboard focus (and the scanner's input) in the code box
+		self.setFocusPolicy(Qt.NoFocus)
+		self.clicked.connect(lambda index: self.product_clicked.emit(index.data(ItemIdRole)))
+
+	def resizeEvent(self, event):
+		super().resizeEvent(event)
+		# The wrapping layout keeps room for a vertical scroll bar even while it is hidden
+		spare = self.viewport().width() - self.style().pixelMetric(QStyle.PM_ScrollBarExtent) - 1
+		width = max(1, spare // self.COLUMNS)
+		self.setGridSize(QSize(width, self.TILE_HEIGHT))
+
+def make_filter_box(placeholder="Ürün ara..."):
+	box = set_role(QLineEdit(), "search")
+	box.setPlaceholderText(placeholder)
+	box.setClearButtonEnabled(True)
+	return box
@@ -0,0 +1,49 @@
+from PySide6.QtCore import QObject, Signal
+
+class FutureRelay(QObject):
+	"""
+	Delivers the result of a concurrent.futures.Future on the Qt GUI thread.
+	The future's done-callback runs on the database worker thread; emitting
+	a signal from there queues the call into the GUI event loop.
+	"""
+	finished = Signal(object)
+	_pending = set()
+
+	def __init__(self, future, callback):
+		super().__init__()
+		self.callback = callback
+		self.finished.connect(self._deliver)
+		# Keep the relay alive until the result has been delivered
+		FutureRelay._pending.add(self)
+		future.add_done_callback(self.finished.emit)
+
+	def _deliver(self, future):
+		FutureRelay._pending.discard(self)
+		try:
+			result = future.result()
+		except Exception as e:
+			print(f"ERROR   : {e}")
+			return
+		self.callback(result)
+
+def on_result(future, callback):
+	"""Calls callback(result) on the GUI thread once future has finished."""
+	return FutureRelay(future, callback)
+
+class GuiRelay(QObject):
+	"""
+	A callable that can be called from any thread; each call runs
+	callback(*args) on the GUI thread. Create it on the GUI thread.
+	"""
+	called = Signal(tuple)
+
+	def __init__(self, callback):
+		super().__init__()
+		self.callback = callback
+		self.called.connect(self._deliver)
+
+	def __call__(self, *args):
+		self.called.emit(args)
+
+	def _deliver(self, args):
+		self.callback(*args)
@@ -0,0 +1,75 @@
+import queue
+import threading
+
+from PySide6.QtCore import QObject, Signal
+
+class ReportJob(QObject):
+	"""
+	One queued report. Its signals are emitted on the report thread and
+	delivered on the GUI thread, like FutureRelay's.
+	"""
+	started = Signal()
+	progress = Signal(int, int)  # sales drawn, sales in the range
+	finished = Signal(str)       # path of the PDF
+	failed = Signal(str)
+	cancelled = Signal()
+
+	def __init__(self, pdf_name, start, end=None):
+		super().__init__()
+		self.pdf_name = pdf_name
+		self.start = start
+		self.end = end
+		self.cancel_requested = threading.Event()
+
+	def cancel(self):
+		"""Stops the job at its next progress check, or before it starts if it is still queued."""
+		self.cancel_requested.set()
+
+class ReportQueue:
+	"""
+	Renders reports one at a time on a background thread, each through
+	satislar.sales_report_pdf on its own read-only snapshot, so the GUI
+	thread and the checkout writer never wait for ReportLab.
+	"""
+	def __init__(self, db_name, name="report-worker"):
+		self.db_name = db_name
+		self.jobs = queue.SimpleQueue()
+		self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+		self.thread.start()
+
+	def enqueue(self, job):
+		"""
+		Queues a ReportJob and returns it. Connect the job's signals first:
+		the report thread may start on it at once, and a signal emitted
+		before its slot is connected is lost.
+		"""
+		self.jobs.put(job)
+		return job
+
+	def close(self):
+		"""Lets the job being drawn finish, drops the queued ones and stops the thread."""
+		self.jobs.put(None)
+		self.thread.join(timeout=5)
+
+	def _run(self):
+		# Imported here: reportlab is slow to import and only reports need it
+		import satislar
+		while True:
+			job = self.jobs.get()
+			if job is None:
+				return
+			if job.cancel_requested.is_set():
+				job.cancelled.emit()
+				continue
+			job.started.emit()
+			try:
+				satislar.sales_report_pdf(self.db_name, job.pdf_name, job.start, job.end,
+					progress=job.progress.emit, cancelled=job.cancel_requested.is_set)
+			except satislar.ReportCancelled:
+				print(f"REPORT  : {job.pdf_name} cancelled")
+				job.cancelled.emit()
+			except Exception as e:
+				print(f"ERROR   : Report {job.pdf_name}: {e}")
+				job.failed.emit(str(e))
+			else:
+				job.finished.emit(job.pdf_name)
@@ -1,138 +1,412 @@
+import argparse
+import hashlib
+import os
+import shutil
 import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, timedelta
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
+
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
 from reportlab.lib import colors
 from reportlab.lib.units import mm
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.pdfbase import pdfmetrics
-from datetime import datetime
 
-# PDF için DejaVu fontu
-pdfmetrics.registerFont(TTFont('DejaVu', 'DejaVuSans.ttf'))
+from connections import connect_reader, read_snapshot
 
 DB_NAME = "database.db"
 PDF_NAME = "gunluk_rapor.pdf"
 
-def sales_report_pdf(db_name=DB_NAME, pdf_name=PDF_NAME):
-    conn = sqlite3.connect(db_name)
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT 
-            s.sale_id,
-            s.customer_name,
-            s.total_amount,
-            s.payment_method,
-            s.payment_info,
-            ci.item_count,
-            i.item_name,
-            i.item_price,
-            ci.item_total
-        FROM sales AS s
-        JOIN cart_items AS ci ON s.sale_id = ci.sale_id
-        JOIN items AS i ON ci.item_id = i.item_id
-        WHERE DATE(s.sale_date) = '2025-09-03'
-        ORDER BY s.sale_date, s.sale_id;
-    """)
-
-    rows = cursor.fetchall()
-
-    # organize by sale_id
-    sales_dict = {}
-    for row in rows:
-        sale_id, cname, total, pay_method, pay_info, count, item_name, item_price, item_total = row
-        if sale_id not in sales_dict:
-            sales_dict[sale_id] = {
-                "customer_name": cname,
-                "total": total,
-                "payment_method": pay_method,
-                "payment_info": pay_info,
-                "items": []
-            }
-        sales_dict[sale_id]["items"].append((count, item_name, item_price, item_total))
-
-    # PDF oluştur
-    c = canvas.Canvas(pdf_name, pagesize=A4)
-    width, height = A4
-    c.setFont("DejaVu", 14)
-    c.drawString(20*mm, height-20*mm, f"Günlük Satış Raporu - {datetime.now().strftime('%d %B %Y')}")
-
-    y = height - 30*mm
-    c.setFont("DejaVu", 10)
-
-    # Sütun başlıkları
-    col_widths = [35*mm, 15*mm, 50*mm, 25*mm, 30*mm, 30*mm]
-    headers = ["Müşteri Adı", "Adet", "Ürün", "Ürün Fiyatı", "Toplam Tutar", "Ödeme Biçimi"]
-    x = 20*mm
-    for i, header in enumerate(headers):
-        c.setFillColor(colors.lightgrey)
-        c.rect(x, y, col_widths[i], 8*mm, fill=1, stroke=0)
-        c.setFillColor(colors.black)
-        c.drawString(x+2*mm, y+2*mm, header)
-        x += col_widths[i]
+# Rendered reports are kept here under the hash of their date range and
+# the rows they were drawn from; bump REPORT_LAYOUT when the drawing code
+# changes so older files are not served.
+REPORT_CACHE_DIR = "report_cache"
+REPORT_CACHE_SIZE = 500
+REPORT_LAYOUT = 1
 
-    y -= 8*mm
+# Sales drawn between two progress callbacks
+PROGRESS_EVERY = 50
 
-    total_nakit = 0
-    total_iban = 0
-    total_all = 0
+class ReportCancelled(Exception):
+    """Raised by sales_report_pdf when its cancelled() check returns True."""
 
-    # Satırları yaz
-    for sale in sales_dict.values():
-        cname = sale["customer_name"]
-        total = sale["total"]
-        method = sale["payment_method"]
-        info = sale["payment_info"] or ""
-        pay_text = f"{method} ({info})" if info else method
+@lru_cache(maxsize=None)
+def register_fonts():
+    """Parses and registers the DejaVu font the first time a report is drawn in this process."""
+    # PDF için DejaVu fontu
+    pdfmetrics.registerFont(TTFont('DejaVu', 'DejaVuSans.ttf'))
 
-        first_row = True
-        for count, item_name, price, item_total in sale["items"]:
-            x = 20*mm
-            row_height = 7*mm
-            # Satır arka plan zebra
-            if (int(y//row_height) %2)==0:
-                c.setFillColorRGB(0.95,0.95,0.95)
-                c.rect(x, y, sum(col_widths), row_height, fill=1, stroke=0)
+# sale_date is an ISO timestamp, so a half-open string range selects whole
+# days and is answered from idx_sales_date (DATE(sale_date) = ? is not).
+# Rows come out grouped by sale; items keep the order they were added in.
+# Unpaid (WIP) sales are left out, like in the daily_sales_summary totals.
+REPORT_QUERY = """
+    SELECT
+        s.sale_id,
+        s.customer_name,
+        s.total_amount,
+        s.payment_method,
+        s.payment_info,
+        ci.item_count,
+        i.item_name,
+        i.item_price,
+        ci.item_total
+    FROM sales AS s
+    JOIN cart_items AS ci ON s.sale_id = ci.sale_id
+    JOIN items AS i ON ci.item_id = i.item_id
+    WHERE s.sale_date >= ? AND s.sale_date < ? AND s.payment_method != 'WIP'
+    ORDER BY s.sale_date, s.sale_id, ci.cart_item_id
+"""
+
+# Totals per payment method come from the daily rollup: one row per day
+# and method, whatever the number of sales
+TOTALS_QUERY = """
+    SELECT payment_method, SUM(sale_count), SUM(total_amount)
+    FROM daily_sales_summary
+    WHERE day >= ? AND day < ?
+    GROUP BY payment_method
+"""
+
+# Same totals straight from sales, for a database not yet migrated to the rollup
+SALES_TOTALS_QUERY = """
+    SELECT payment_method, COUNT(*), SUM(total_amount)
+    FROM sales
+    WHERE sale_date >= ? AND sale_date < ? AND payment_method != 'WIP'
+    GROUP BY payment_method
+"""
+
+COL_WIDTHS = [35*mm, 15*mm, 50*mm, 25*mm, 30*mm, 30*mm]
+HEADERS = ["Müşteri Adı", "Adet", "Ürün", "Ürün Fiyatı", "Toplam Tutar", "Ödeme Biçimi"]
+# Columns of the batch index document
+INDEX_COL_WIDTHS = [30*mm, 55*mm, 20*mm, 30*mm, 30*mm, 30*mm]
+INDEX_HEADERS = ["Gün", "Dosya", "Satış", "Nakit", "IBAN", "Toplam"]
+LEFT = 20*mm
+ROW_HEIGHT = 7*mm
+BOTTOM = 40*mm
+
+def as_date(value):
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+def day_bounds(start, end=None):
+    """Returns the [start, day after end) sale_date bounds of a day or an inclusive range of days."""
+    first = as_date(start)
+    last = as_date(end) if end else first
+    return first.isoformat(), (last + timedelta(days=1)).isoformat()
+
+def iter_sales(conn, start, end=None):
+    """
+    Yields the sales of a day or range of days one at a time, as
+    (sale_id, customer_name, total, payment_method, payment_info, items)
+    with items a list of (count, item_name, item_price, item_total).
+    The cursor is consumed as a stream; only one sale is held at a time.
+    """
+    cursor = conn.execute(REPORT_QUERY, day_bounds(start, end))
+    for sale_id, rows in groupby(cursor, key=itemgetter(0)):
+        first = next(rows)
+        items = [first[5:]]
+        items.extend(row[5:] for row in rows)
+        yield (*first[:5], items)
+
+def payment_totals(conn, start, end=None):
+    """Returns {payment method (lower case): (sale count, total)} of the paid sales of a day or range of days."""
+    bounds = day_bounds(start, end)
+    try:
+        rows = conn.execute(TOTALS_QUERY, bounds).fetchall()
+    except sqlite3.OperationalError:
+        rows = conn.execute(SALES_TOTALS_QUERY, bounds).fetchall()
+    totals = {}
+    for method, count, amount in rows:
+        prev_count, prev_amount = totals.get(method.lower(), (0, 0))
+        totals[method.lower()] = (prev_count + count, prev_amount + amount)
+    return totals
+
+class ReportWriter:
+    """Draws the report onto a canvas row by row, starting a new page (with the column headers) when one fills up."""
+    def __init__(self, pdf_name, title, headers=HEADERS, col_widths=COL_WIDTHS):
+        register_fonts()
+        self.headers = headers
+        self.col_widths = col_widths
+        self.canvas = canvas.Canvas(pdf_name, pagesize=A4)
+        self.width, self.height = A4
+        self.canvas.setFont("DejaVu", 14)
+        self.canvas.drawString(LEFT, self.height-20*mm, title)
+        self.y = self.height - 30*mm
+        self.draw_headers()
+
+    def draw_headers(self):
+        c = self.canvas
+        c.setFont("DejaVu", 10)
+        x = LEFT
+        for width, header in zip(self.col_widths, self.headers):
+            c.setFillColor(colors.lightgrey)
+            c.rect(x, self.y, width, 8*mm, fill=1, stroke=0)
             c.setFillColor(colors.black)
+            c.drawString(x+2*mm, self.y+2*mm, header)
+            x += width
+        self.y -= 8*mm
+
+    def new_page(self):
+        self.canvas.showPage()
+        self.y = self.height - 20*mm
+        self.draw_headers()
+
+    def row(self, values):
+        if self.y < BOTTOM:
+            self.new_page()
+        c = self.canvas
+        x = LEFT
+        # Satır arka plan zebra
+        if (int(self.y//ROW_HEIGHT) %2)==0:
+            c.setFillColorRGB(0.95,0.95,0.95)
+            c.rect(x, self.y, sum(self.col_widths), ROW_HEIGHT, fill=1, stroke=0)
+        c.setFillColor(colors.black)
+        for width, val in zip(self.col_widths, values):
+            c.drawString(x+2*mm, self.y+2*mm, val)
+            x += width
+        self.y -= ROW_HEIGHT
 
-            row_values = [
+    def sale(self, cname, total, method, info, items):
+        pay_text = f"{method} ({info})" if info else method
+        first_row = True
+        for count, item_name, price, item_total in items:
+            self.row([
                 cname if first_row else "",
                 str(count),
                 item_name,
                 f"{price:.2f} TL",
                 f"{total:.2f} TL" if first_row else "",
                 pay_text if first_row else ""
-            ]
-            for i, val in enumerate(row_values):
-                c.drawString(x+2*mm, y+2*mm, val)
-                x += col_widths[i]
-            y -= row_height
+            ])
             first_row = False
 
-        total_all += total
-        if method.lower() == "nakit":
-            total_nakit += total
-        elif method.lower() == "iban":
-            total_iban += total
-
-        # Sayfa altına gelirse yeni sayfa aç
-        if y < 40*mm:
-            c.showPage()
-            c.setFont("DejaVu", 10)
-            y = height - 20*mm
-
-    # Özet alanı
-    y -= 10*mm
-    c.setFont("DejaVu", 12)
-    c.drawString(20*mm, y, f"Toplam Nakit Gelir: {total_nakit:.2f} TL")
-    y -= 7*mm
-    c.drawString(20*mm, y, f"Toplam IBAN Gelir:  {total_iban:.2f} TL")
-    y -= 7*mm
-    c.drawString(20*mm, y, f"Toplam Gelir:       {total_all:.2f} TL")
-
-    c.save()
-    conn.close()
+    def summary(self, total_nakit, total_iban, total_all):
+        # Özet alanı
+        if self.y < BOTTOM:
+            self.canvas.showPage()
+            self.y = self.height - 20*mm
+        c = self.canvas
+        self.y -= 10*mm
+        c.setFont("DejaVu", 12)
+        c.drawString(LEFT, self.y, f"Toplam Nakit Gelir: {total_nakit:.2f} TL")
+        self.y -= 7*mm
+        c.drawString(LEFT, self.y, f"Toplam IBAN Gelir:  {total_iban:.2f} TL")
+        self.y -= 7*mm
+        c.drawString(LEFT, self.y, f"Toplam Gelir:       {total_all:.2f} TL")
+
+    def save(self):
+        self.canvas.save()
+
+def report_title(start, end=None):
+    first = as_date(start)
+    last = as_date(end) if end else first
+    if first == last:
+        return f"Günlük Satış Raporu - {first.strftime('%d %B %Y')}"
+    return f"Satış Raporu - {first.strftime('%d %B %Y')} / {last.strftime('%d %B %Y')}"
+
+def report_digest(conn, start, end=None):
+    """
+    Hash of everything a report shows: the layout version, the date range,
+    its rows and its totals. Reading the rows is cheap next to drawing
+    them, and any change to a sale, line or item name in the range gives a
+    new digest.
+    """
+    bounds = day_bounds(start, end)
+    digest = hashlib.sha256(repr((REPORT_LAYOUT, bounds)).encode())
+    for row in conn.execute(REPORT_QUERY, bounds):
+        digest.update(repr(tuple(row)).encode())
+    digest.update(repr(sorted(payment_totals(conn, start, end).items())).encode())
+    return digest.hexdigest()
+
+def prune_cache(cache_dir, keep=REPORT_CACHE_SIZE):
+    """Deletes all but the keep most recently used reports in cache_dir."""
+    entries = [entry for entry in os.scandir(cache_dir) if entry.name.endswith(".pdf")]
+    if len(entries) <= keep:
+        return
+    entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in entries[keep:]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+def count_sales(conn, start, end=None):
+    return conn.execute(
+        "SELECT COUNT(*) FROM sales WHERE sale_date >= ? AND sale_date < ? AND payment_method != 'WIP'",
+        day_bounds(start, end)).fetchone()[0]
+
+def draw_report(conn, pdf_name, start, end=None, progress=None, cancelled=None):
+    """
+    Draws the report of a range to pdf_name. progress(done, total) is called
+    every PROGRESS_EVERY sales and cancelled() is checked as often; when it
+    returns True, ReportCancelled is raised before anything is written.
+    """
+    writer = ReportWriter(pdf_name, report_title(start, end))
+    total_sales = count_sales(conn, start, end) if progress else 0
+    for done, (sale_id, cname, total, method, info, items) in enumerate(iter_sales(conn, start, end), 1):
+        writer.sale(cname, total, method, info, items)
+        if done % PROGRESS_EVERY == 0:
+            if cancelled and cancelled():
+                raise ReportCancelled(pdf_name)
+            if progress:
+                progress(done, total_sales)
+    if cancelled and cancelled():
+        raise ReportCancelled(pdf_name)
+    totals = payment_totals(conn, start, end)
+    writer.summary(
+        totals.get("nakit", (0, 0))[1],
+        totals.get("iban", (0, 0))[1],
+        sum(amount for count, amount in totals.values()))
+    writer.save()
+    if progress:
+        progress(total_sales, total_sales)
+
+def sales_report_pdf(db_name=DB_NAME, pdf_name=PDF_NAME, start=None, end=None, cache_dir=REPORT_CACHE_DIR,
+                     progress=None, cancelled=None):
+    """
+    Writes the sales of a day (today by default) or of the days from start
+    to end inclusive to pdf_name. Sales are drawn as they are read, so
+    memory does not grow with the number of sales in the range.
+    If the same range was rendered before from the same data, the PDF is
+    copied from cache_dir instead of being drawn again (cache_dir=None
+    always draws). progress and cancelled are passed to draw_report().
+    """
+    start = start or date.today()
+    # Read-only snapshot: with the database in WAL mode the report never
+    # blocks checkout, and the digest and the drawing see the same rows
+    with read_snapshot(db_name) as conn:
+        if cache_dir is None:
+            draw_report(conn, pdf_name, start, end, progress, cancelled)
+        else:
+            os.makedirs(cache_dir, exist_ok=True)
+            cached = os.path.join(cache_dir, f"{report_digest(conn, start, end)}.pdf")
+            if os.path.exists(cached):
+                os.utime(cached)
+                shutil.copyfile(cached, pdf_name)
+                print(f"{pdf_name} önbellekten alındı.")
+                return pdf_name
+            # Drawn under a temporary name so a parallel worker never copies a half-written file
+            partial = f"{cached}.{os.getpid()}.{threading.get_ident()}.tmp"
+            draw_report(conn, partial, start, end, progress, cancelled)
+            os.replace(partial, cached)
+            shutil.copyfile(cached, pdf_name)
+            prune_cache(cache_dir)
     print(f"{pdf_name} oluşturuldu.")
+    return pdf_name
+
+def days(start, end):
+    day = as_date(start)
+    while day <= as_date(end):
+        yield day
+        day += timedelta(days=1)
+
+def render_report(db_name, pdf_name, start, end=None, cache_dir=REPORT_CACHE_DIR):
+    """Pool worker: renders one report on its own read-only connection and returns (pdf_name, seconds)."""
+    started = time.perf_counter()
+    sales_report_pdf(db_name, pdf_name, start, end, cache_dir)
+    return pdf_name, time.perf_counter() - started
+
+def index_pdf(db_name, pdf_name, start, end, files):
+    """Writes a document listing each day's report file with its totals from the daily rollup."""
+    conn = connect_reader(db_name)
+    try:
+        writer = ReportWriter(pdf_name, report_title(start, end), INDEX_HEADERS, INDEX_COL_WIDTHS)
+        for day in days(start, end):
+            totals = payment_totals(conn, day)
+            nakit = totals.get("nakit", (0, 0))[1]
+            iban = totals.get("iban", (0, 0))[1]
+            writer.row([
+                day.isoformat(),
+                os.path.basename(files[day]),
+                str(sum(count for count, amount in totals.values())),
+                f"{nakit:.2f} TL",
+                f"{iban:.2f} TL",
+                f"{sum(amount for count, amount in totals.values()):.2f} TL",
+            ])
+        totals = payment_totals(conn, start, end)
+        writer.summary(
+            totals.get("nakit", (0, 0))[1],
+            totals.get("iban", (0, 0))[1],
+            sum(amount for count, amount in totals.values()))
+        writer.save()
+    finally:
+        conn.close()
+    return pdf_name
+
+def batch_reports(db_name=DB_NAME, start=None, end=None, out_dir=".", workers=None, cache_dir=REPORT_CACHE_DIR):
+    """
+    Renders one PDF per day from start to end plus one for the whole range,
+    spread over a process pool (one worker per core by default), then an
+    index document of the daily files and their totals. Each worker opens
+    its own read-only connection. Returns {file name: render seconds}.
+    """
+    start = as_date(start or date.today())
+    end = as_date(end or start)
+    os.makedirs(out_dir, exist_ok=True)
+    span = f"{start.isoformat()}_{end.isoformat()}"
+    files = {day: os.path.join(out_dir, f"rapor_{day.isoformat()}.pdf") for day in days(start, end)}
+    timings = {}
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        # The range report is the longest job, so it goes in first
+        jobs = [pool.submit(render_report, db_name, os.path.join(out_dir, f"rapor_{span}.pdf"), start, end, cache_dir)]
+        jobs.extend(pool.submit(render_report, db_name, pdf_name, day, None, cache_dir) for day, pdf_name in files.items())
+        for job in as_completed(jobs):
+            pdf_name, seconds = job.result()
+            timings[pdf_name] = seconds
+            print(f"REPORT  : {os.path.basename(pdf_name)} in {seconds:.2f} s")
+    index_pdf(db_name, os.path.join(out_dir, f"rapor_{span}_index.pdf"), start, end, files)
+    elapsed = time.perf_counter() - started
+    print(f"REPORT  : {len(timings)} reports in {elapsed:.2f} s ({sum(timings.values()):.2f} s of rendering)")
+    return timings
+
+def month_bounds(month):
+    """Returns the first and last day of a 'YYYY-MM' month."""
+    first = date.fromisoformat(f"{month}-01")
+    following = (first.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return first, following - timedelta(days=1)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Satış raporunu PDF olarak oluşturur.")
+    parser.add_argument("start", nargs="?", default=None,
+                        help="first day, YYYY-MM-DD (default: today)")
+    parser.add_argument("end", nargs="?", default=None,
+                        help="last day, inclusive (default: same as start)")
+    parser.add_argument("--db", default=DB_NAME, help=f"database file (default: {DB_NAME})")
+    parser.add_argument("-o", "--output", default=PDF_NAME, help=f"PDF file (default: {PDF_NAME})")
+    parser.add_argument("--batch", action="store_true",
+                        help="one PDF per day plus a range report and an index, rendered in parallel")
+    parser.add_argument("--month", metavar="YYYY-MM", help="batch report of a whole month (implies --batch)")
+    parser.add_argument("--out-dir", default=".", help="directory for the batch PDFs (default: .)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="report processes (default: one per CPU core)")
+    parser.add_argument("--cache-dir", default=REPORT_CACHE_DIR,
+                        help=f"directory of previously rendered reports (default: {REPORT_CACHE_DIR})")
+    parser.add_argument("--no-cache", dest="cache_dir", action="store_const", const=None,
+                        help="always draw the reports again")
+    args = parser.parse_args(argv)
+    try:
+        if args.month:
+            if args.start or args.end:
+                parser.error("--month takes no start or end day")
+            args.start, args.end = month_bounds(args.month)
+            args.batch = True
+        args.start = as_date(args.start) if args.start else None
+        args.end = as_date(args.end) if args.end else None
+    except ValueError as e:
+        parser.error(str(e))
+    if args.start and args.end and args.end < args.start:
+        parser.error("end is before start")
+    return args
 
 if __name__ == "__main__":
-    sales_report_pdf()
+    args = parse_args()
+    if args.batch:
+        batch_reports(args.db, args.start, args.end, args.out_dir, args.workers, args.cache_dir)
+    else:
+        sales_report_pdf(args.db, args.output, args.start, args.end, args.cache_dir)
@@ -0,0 +1,50 @@
+import sqlite3
+import time
+
+import pytest
+
+from db_worker import DatabaseWorker
+
+def create_table(worker):
+	worker.submit(lambda conn: conn.execute("CREATE TABLE t (x INTEGER CHECK(x > 0))"), flush=True).result()
+
+def rows(worker):
+	return [row[0] for row in worker.call(lambda conn: conn.execute("SELECT x FROM t ORDER BY x").fetchall())]
+
+def test_commit_delay_bounds_unflushed_writes_under_load(tmp_path):
+	worker = DatabaseWorker(str(tmp_path / "w.db"), commit_delay=0.05)
+	try:
+		create_table(worker)
+		job_time = 0.005
+		def slow_insert(conn, x):
+			time.sleep(job_time)
+			conn.execute("INSERT INTO t VALUES (?)", (x, ))
+		# Queued faster than they run: the queue stays busy for about a second
+		start = time.monotonic()
+		futures = [worker.submit(slow_insert, x) for x in range(1, 201)]
+		futures[0].result(timeout=5)
+		committed_after = time.monotonic() - start
+		assert committed_after < 0.05 + 10 * job_time
+		assert not futures[-1].done()
+		futures[-1].result(timeout=5)
+	finally:
+		worker.close()
+
+def test_failing_write_only_rolls_back_itself(tmp_path):
+	worker = DatabaseWorker(str(tmp_path / "w.db"), commit_delay=0.05)
+	try:
+		create_table(worker)
+		good = worker.submit(lambda conn: conn.execute("INSERT INTO t VALUES (1)"))
+		def half_then_fail(conn):
+			conn.execute("INSERT INTO t VALUES (2)")
+			conn.execute("INSERT INTO t VALUES (0)")  # violates the CHECK
+		bad = worker.submit(half_then_fail)
+		after = worker.submit(lambda conn: conn.execute("INSERT INTO t VALUES (3)"))
+		worker.flush().result(timeout=5)
+		with pytest.raises(sqlite3.IntegrityError):
+			bad.result()
+		good.result()
+		after.result()
+		assert rows(worker) == [1, 3]
+	finally:
+		worker.close()
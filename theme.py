@@ -0,0 +1,174 @@
+# Application-wide theme.
+#
+# Every style the screens used to set inline lives in STYLESHEET, which is
+# installed once on the QApplication by apply_theme(). Qt parses it a
+# single time; widgets only carry an object name or a "role" property
+# (set with set_role() before they are first shown) that the rules select
+# on, so building a screen or a list row no longer parses any CSS.
+#
+# Font sizes that differ between the cashier and customer screens (cart
+# and total rows) are set with QFont in code rather than in the sheet.
+
+STYLESHEET = """
+QMainWindow, QStackedWidget, QStackedWidget QWidget {
+	background-color: #111;
+}
+
+/* --- labels --- */
+QLabel[role="title"] {
+	font-size: 72px;
+	font-weight: bold;
+	color: white;
+}
+QLabel[role="welcome"] {
+	font-size: 72px;
+	font-weight: bold;
+	color: #999;
+}
+QLabel[role="info"] {
+	font-size: 28px;
+	color: white;
+	padding: 10px;
+	font-weight: bold;
+}
+
+/* --- text inputs --- */
+QLineEdit[role="name"] {
+	font-size: 48px;
+	padding: 15px;
+	background-color: #34495e;
+	color: white;
+	border: 2px solid white;
+	border-radius: 10px;
+}
+QLineEdit[role="search"] {
+	font-size: 28px;
+	padding: 8px;
+	background-color: #34495e;
+	color: white;
+	border: 2px solid white;
+	border-radius: 10px;
+}
+
+/* --- main menu --- */
+QPushButton[role="menu"] {
+	color: white;
+	font-size: 48px;
+	font-weight: bold;
+	padding: 20px;
+	border-radius: 10px;
+	width: 500px;
+	height: 80px;
+}
+QPushButton#newSaleButton { background-color: #27ae60; border: 2px solid #229954; }
+QPushButton#salesButton { background-color: #f39c12; border: 2px solid #e67e22; }
+QPushButton#stockButton { background-color: #3498db; border: 2px solid #2980b9; }
+QPushButton#onholdButton { background-color: #C27D0E; border: 2px solid #c0392b; }
+QPushButton#quitButton { background-color: #e74c3c; border: 2px solid #c0392b; }
+QPushButton#newSaleButton:hover, QPushButton#salesButton:hover, QPushButton#stockButton:hover,
+QPushButton#onholdButton:hover, QPushButton#quitButton:hover {
+	border: 5px solid #999;
+}
+
+/* --- screen buttons ("Geri", "Askıya Al", "Nakit", ...) --- */
+QPushButton[role="action"], QPushButton[role="form"] {
+	background-color: #2c3e50;
+	color: white;
+	font-size: 48px;
+	font-weight: bold;
+	padding: 20px;
+	border-radius: 10px;
+	height: 80px;
+	border: 2px solid white;
+}
+QPushButton[role="action"] {
+	width: 450px;
+}
+QPushButton[role="form"] {
+	height: 60px;
+}
+QPushButton[role="action"]:hover, QPushButton[role="form"]:hover {
+	background-color: #34495e;
+}
+QPushButton#startSaleButton {
+	background-color: #55cc55;
+	margin-top: 5px;
+}
+
+/* --- on-hold sales list --- */
+QListView#onholdList {
+	border: none;
+}
+QListView#onholdList::item {
+	background-color: #34495e;
+	color: white;
+	padding-left: 20px;
+	border-radius: 10px;
+	border: 2px solid white;
+}
+QListView#onholdList::item:hover {
+	background-color: #2c3e50;
+}
+
+/* --- sales screen reports --- */
+QProgressBar#reportProgress {
+	font-size: 28px;
+	color: white;
+	background-color: #34495e;
+	border: 2px solid white;
+	border-radius: 10px;
+	text-align: center;
+	height: 40px;
+}
+QProgressBar#reportProgress::chunk {
+	background-color: #27ae60;
+	border-radius: 8px;
+}
+
+/* --- product grid --- */
+QListView#productGrid {
+	border: 2px solid #111;
+	border-radius: 10px;
+	background-color: #333;
+}
+QListView#productGrid::item {
+	background-color: #2c3e50;
+	color: white;
+	border: 2px solid #555;
+	border-radius: 10px;
+	margin: 4px;
+}
+QListView#productGrid::item:hover {
+	background-color: #34495e;
+}
+
+/* --- cart --- */
+QTableView#cartView {
+	border: 2px solid #111;
+	border-radius: 10px;
+	background-color: #333;
+}
+QTableView#cartView::item {
+	background-color: #2c3e50;
+	color: white;
+	border-top: 1px solid white;
+	border-bottom: 1px solid white;
+	margin-bottom: 5px;
+	padding: 0px 5px;
+}
+QWidget#totalRow, QWidget#totalRow QLabel {
+	background-color: #3e502c;
+	color: white;
+	border: .3px solid white;
+	border-radius: 5px;
+	margin-bottom: 5px;
+}
+"""
+
+def set_role(widget, role):
+	"""Tags widget for the [role="..."] rules of the theme; returns it for chaining."""
+	widget.setProperty("role", role)
+	return widget
+
+def apply_theme(app):
+	app.setStyleSheet(STYLESHEET)
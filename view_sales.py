@@ -1,51 +1,111 @@
+import os
+from datetime import date
+
 from PySide6.QtWidgets import (
 	QWidget, QVBoxLayout, QPushButton,
-	QLabel, QHBoxLayout, QStackedWidget
+	QLabel, QHBoxLayout, QStackedWidget, QLineEdit, QProgressBar
 )
 from PySide6.QtCore import Qt, Signal
+from report_jobs import ReportJob, ReportQueue
+from theme import set_role
+
+# Reports made from the sales screen are written here
+REPORTS_DIR = "raporlar"
 
 class SalesScreen(QWidget):
 	"""
-	A placeholder screen for the 'Satışları Görüntüle' view.
+	The 'Satışları Görüntüle' view: queues the day's (Z) report on a
+	background ReportQueue and shows its progress; the till keeps selling
+	while it is drawn.
 	"""
 	back_to_menu = Signal()
-	def __init__(self, parent=None):
+	def __init__(self, app_data, parent=None):
 		super().__init__(parent)
+		self.reports = ReportQueue(app_data.database_manager.db_name)
+		self.active_jobs = []
+
 		layout = QVBoxLayout()
 		layout.setAlignment(Qt.AlignCenter)
 
-		title = QLabel("Satışlar Ekranı:")
-		title.setStyleSheet("""
-			font-size: 72px;
-			font-weight: bold;
-			color: white;
-		""")
+		title = set_role(QLabel("Satışlar Ekranı:"), "title")
 		title.setAlignment(Qt.AlignCenter)
 
-		back_button = QPushButton("Geri")
-		back_button.setStyleSheet("""
-			QPushButton {
-				background-color: #2c3e50;
-				color: white;
-				font-size: 48px;
-				font-weight: bold;
-				padding: 20px;
-				border-radius: 10px;
-				width: 450px;
-				height: 80px;
-				border: 2px solid white;
-			}
-			QPushButton:hover {
-				background-color: #34495e;
-			}
-		""")
+		self.day_input = set_role(QLineEdit(date.today().isoformat()), "search")
+		self.day_input.setPlaceholderText("YYYY-AA-GG")
+		self.report_button = set_role(QPushButton("Z Raporu"), "action")
+		self.cancel_button = set_role(QPushButton("İptal"), "action")
+		self.cancel_button.setEnabled(False)
+		report_row = QHBoxLayout()
+		report_row.addWidget(self.day_input)
+		report_row.addWidget(self.report_button)
+		report_row.addWidget(self.cancel_button)
+
+		self.progress_bar = QProgressBar()
+		self.progress_bar.setObjectName("reportProgress")
+		self.progress_bar.setRange(0, 1)
+		self.progress_bar.setValue(0)
+		self.status_label = set_role(QLabel(""), "info")
+		self.status_label.setAlignment(Qt.AlignCenter)
+
+		back_button = set_role(QPushButton("Geri"), "action")
 
 		layout.addWidget(title)
+		layout.addLayout(report_row)
+		layout.addWidget(self.progress_bar)
+		layout.addWidget(self.status_label)
 		layout.addWidget(back_button)
 		self.setLayout(layout)
 
 		self.back_button = back_button
 		self.back_button.clicked.connect(self.back_to_menu.emit)
+		self.report_button.clicked.connect(self.start_report)
+		self.day_input.returnPressed.connect(self.start_report)
+		self.cancel_button.clicked.connect(self.cancel_reports)
+
+	def start_report(self):
+		try:
+			day = date.fromisoformat(self.day_input.text().strip())
+		except ValueError:
+			self.status_label.setText("Geçersiz tarih")
+			return
+		os.makedirs(REPORTS_DIR, exist_ok=True)
+		pdf_name = os.path.join(REPORTS_DIR, f"z_raporu_{day.isoformat()}.pdf")
+		job = ReportJob(pdf_name, day)
+		job.started.connect(lambda: self.show_status(job, "hazırlanıyor..."))
+		job.progress.connect(self.show_progress)
+		job.finished.connect(lambda path: self.job_done(job, f"hazır: {os.path.abspath(path)}"))
+		job.failed.connect(lambda error: self.job_done(job, f"oluşturulamadı ({error})"))
+		job.cancelled.connect(lambda: self.job_done(job, "iptal edildi"))
+		self.active_jobs.append(job)
+		self.reports.enqueue(job)
+		self.cancel_button.setEnabled(True)
+		self.show_status(job, "sırada" if len(self.active_jobs) > 1 else "hazırlanıyor...")
+
+	def show_status(self, job, text):
+		self.status_label.setText(f"{job.start.isoformat()} raporu {text}")
+
+	def show_progress(self, done, total):
+		self.progress_bar.setRange(0, max(total, 1))
+		self.progress_bar.setValue(min(done, max(total, 1)))
+
+	def job_done(self, job, text):
+		if job in self.active_jobs:
+			self.active_jobs.remove(job)
+		self.show_status(job, text)
+		if not self.active_jobs:
+			self.cancel_button.setEnabled(False)
+			self.progress_bar.setRange(0, 1)
+			self.progress_bar.setValue(0)
+
+	def cancel_reports(self):
+		"""Cancels the report being drawn and every queued one."""
+		for job in self.active_jobs:
+			job.cancel()
+
+	def close_reports(self):
+		for job in self.active_jobs:
+			job.cancel()
+		self.reports.close()
 
 class WelcomeScreen(QWidget):
 	"""
@@ -54,12 +114,7 @@ class WelcomeScreen(QWidget):
 	def __init__(self):
 		super().__init__()
 		layout = QVBoxLayout()
-		label = QLabel("Hoş geldiniz!")
+		label = set_role(QLabel("Hoş geldiniz!"), "welcome")
 		label.setAlignment(Qt.AlignCenter)
-		label.setStyleSheet("""
-			font-size: 72px;
-			font-weight: bold;
-			color: #999;
-		""")
 		layout.addWidget(label)
 		self.setLayout(layout)